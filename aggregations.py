@@ -0,0 +1,99 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+from mappings import *
+from instrument import timed
+
+'''
+Data transforms behind the dashboard figures and KPIs.
+
+These functions only need pandas and the mappings, so scripts and workers can use them without importing
+Plotly or Streamlit. global_plots re-exports them for the dashboard.
+
+Functions included:
+- get_country_demand: Filters the demand of one country and sums it per year.
+- calculate_growth: Computes total and annual growth percentages between two years.
+- highest_category_info: Identifies the most energy-demanding category in a given year.
+- aggregate_country_demand: Aggregates yearly demand data by country and identifies top 5 consumers.
+- focus_color_map: Colors of the fuel groups for a focus option.
+- focus_lookup: Lookup array from fuel group labels to the groups of a focus option.
+- apply_focus_filter: Filters and regroups the PtX fuel groups for a focus option.
+'''
+
+def get_country_demand(df, country_name, sector_name):
+    df_eu27 = df[df['Country'] == country_name]
+    df_grouped = df_eu27.groupby('Year')['Value'].sum().reset_index()
+    df_grouped['Sector'] = sector_name
+    return df_eu27, df_grouped
+
+
+def calculate_growth(value_start, year_start, value_end, year_end):
+    change = ((value_end - value_start) / value_start) * 100
+    annual_growth = ((value_end / value_start) ** (1/(year_end-year_start)) - 1) * 100
+    return change, annual_growth
+
+
+def highest_category_info(data, year):
+    top_cat_key = data[data['Year'] == year].groupby('Category', observed=True)['Value'].sum().idxmax()
+    return top_cat_key, corresponding_cat(top_cat_key)
+
+
+@timed("transform")
+def aggregate_country_demand(df, sector_name):
+    # Drop EU27 and aggregate
+    df = df[df['Country'] != 'EU27']
+    agg_df = df.groupby(['Country', 'Year'], as_index=False, observed=True)['Value'].sum()
+
+    # Filter the most consuming countries
+    top_countries = agg_df.groupby('Country', observed=True)['Value'].sum().nlargest(5).index.tolist()
+    filtered = agg_df[agg_df['Country'].isin(top_countries)]
+    
+    return filtered, top_countries
+
+
+def _regroups(focus):
+    groups = focus_groups.get(focus)
+    return groups is not None and any(fuel != group for fuel, group in groups.items())
+
+
+def focus_color_map(focus):
+    # Regrouping focus options show their own groups, the others the fuel groups
+    if _regroups(focus):
+        return comparison_colors
+    return ptx_fuel_colors
+
+
+@lru_cache(maxsize=None)
+def focus_lookup(focus, labels):
+    # Per label (not per row): index of its group in the returned groups, -1 when the focus drops it.
+    # One extra -1 at the end serves the -1 code of missing values
+    groups = focus_groups[focus]
+    names = list(dict.fromkeys(groups.values()))
+    lookup = np.array([names.index(groups[label]) if label in groups else -1 for label in labels] + [-1])
+    return lookup, np.array(names, dtype=object)
+
+
+# Filter for the user to chose his focus on fuel
+@timed("transform")
+def apply_focus_filter(df, focus):
+    # Rows are selected and relabelled through label codes, without copying the frame first
+    if focus_groups.get(focus) is None:
+        return df
+
+    fuel = df["FuelGroup"]
+    if isinstance(fuel.dtype, pd.CategoricalDtype):
+        codes, labels = fuel.cat.codes.to_numpy(), fuel.cat.categories
+    else:
+        codes, labels = pd.factorize(fuel)
+    lookup, names = focus_lookup(focus, tuple(labels))
+    group_codes = lookup[codes]
+    keep = group_codes >= 0
+
+    selected = df[keep]
+    if not _regroups(focus):
+        return selected
+    # The other columns of the selection are reused as they are; assign() would copy them again
+    columns = {col: selected[col] for col in df.columns}
+    columns["FuelGroup"] = names[group_codes[keep]]
+    return pd.DataFrame(columns, index=selected.index, copy=False)
@@ -0,0 +1,243 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mappings import categories, transport_fuel_paths, dashboard_years, focus_options, custom_blues, custom_reds
+from process import load_transport_data, load_industry_data, load_combined_outputs
+from cube import DemandCube
+from ranking import RankingIndex
+from panel import DemandPanel
+from global_plots import (apply_focus_filter, focus_color_map, plot_ptx_transition_wedge, plot_sector_ptx_intensity,
+                          create_country_combined_plot, create_demand_heatmaps, create_top_demanding_countries_figures)
+from transport_plots import plot_main_transport_stack, create_transport_pie_charts, plot_transport_heatmap
+from industry_plots import plot_main_industry_bar, create_industry_pie_charts, plot_industry_choropleth
+
+'''
+Headless batch renderer for the dashboard figures.
+
+Loads the data once, then renders the full figure set of dashboard_final.py for every
+country x year x focus combination to HTML and/or JSON files, spreading the work over a process pool.
+No Streamlit server is needed.
+
+Usage: python batch_render.py --out reports [--format html,json] [--workers N]
+                              [--countries DE DK] [--years 2030 2050] [--focus "Green fuels only"]
+
+Functions included:
+- load_context: Loads the input data and builds the demand cube and panel once.
+- figure_tasks: Lists every figure to render, one entry per unique set of inputs.
+- render_all: Renders the tasks to files, optionally in a process pool.
+'''
+
+TRANSPORT_NAME = 'Transport'
+INDUSTRY_NAME = 'Industry'
+
+# Names of the files written for builders that return several figures
+MULTI_FIGURE_PARTS = {
+    "transport_pies": ("passenger", "freight"),
+    "industry_pies": ("categories", "materials"),
+    "top_countries": ("transport", "industry"),
+}
+
+_context = None
+
+
+def load_context(transport_file, industry_path, output_path):
+    transport_data = load_transport_data(transport_file, keep_categories=categories + transport_fuel_paths)
+    transport_data = transport_data[transport_data["Category"].isin(categories)]
+    industry_df = load_industry_data(industry_path)
+    final_df = load_combined_outputs(output_path)
+
+    cube = DemandCube.from_frames(transport_data, industry_df, final_df)
+    return {
+        "transport_data": transport_data,
+        "industry_df": industry_df,
+        "cube": cube,
+        "panel": DemandPanel.from_cube(cube),
+        "ranking": RankingIndex.from_cube(cube),
+        "transport_totals": cube.rollup(TRANSPORT_NAME, ['Country', 'Year']),
+        "industry_totals": cube.rollup(INDUSTRY_NAME, ['Country', 'Year'])
+    }
+
+
+# ---- Figure builders, same inputs as in dashboard_final.py ----
+def _ptx_wedge(ctx, country, focus):
+    df = apply_focus_filter(ctx["cube"].frame('PtX', country), focus)
+    return plot_ptx_transition_wedge(df, country, focus_color_map(focus))
+
+
+def _ptx_sectors(ctx, country, year, focus):
+    df = apply_focus_filter(ctx["cube"].frame('PtX', country), focus)
+    return plot_sector_ptx_intensity(df, country, year, focus_color_map(focus))
+
+
+def _country_combined(ctx, country):
+    _, transport_demand = ctx["cube"].country_demand(TRANSPORT_NAME, country)
+    _, industry_demand = ctx["cube"].country_demand(INDUSTRY_NAME, country)
+    return create_country_combined_plot(transport_demand, TRANSPORT_NAME, industry_demand, INDUSTRY_NAME)
+
+
+def _demand_maps(ctx, year):
+    return create_demand_heatmaps(ctx["transport_totals"], ctx["industry_totals"], year)
+
+
+def _transport_stack(ctx, country):
+    return plot_main_transport_stack(ctx["cube"].frame(TRANSPORT_NAME, country), custom_blues)
+
+
+def _transport_pies(ctx, country, year):
+    return create_transport_pie_charts(ctx["cube"].frame(TRANSPORT_NAME, country), year)
+
+
+def _transport_map(ctx, category):
+    return plot_transport_heatmap(ctx["transport_data"], category)
+
+
+def _industry_bar(ctx, country):
+    return plot_main_industry_bar(ctx["cube"].frame(INDUSTRY_NAME, country), custom_reds)
+
+
+def _industry_pies(ctx, year):
+    return create_industry_pie_charts(ctx["cube"].rollup(INDUSTRY_NAME, ['Year', 'Category', 'Fuel'], year=year), year)
+
+
+def _industry_map(ctx, category):
+    return plot_industry_choropleth(ctx["industry_df"], category)
+
+
+def _top_countries(ctx):
+    return create_top_demanding_countries_figures(ctx["ranking"])
+
+
+BUILDERS = {
+    "ptx_wedge": _ptx_wedge,
+    "ptx_sectors": _ptx_sectors,
+    "country_combined": _country_combined,
+    "demand_maps": _demand_maps,
+    "transport_stack": _transport_stack,
+    "transport_pies": _transport_pies,
+    "transport_map": _transport_map,
+    "industry_bar": _industry_bar,
+    "industry_pies": _industry_pies,
+    "industry_map": _industry_map,
+    "top_countries": _top_countries,
+}
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(text)).strip("_").lower()
+
+
+def figure_tasks(ctx, countries, years, focuses):
+    cube = ctx["cube"]
+    tasks = {}
+    # Most demanding category of each country in 2050, as in the dashboard's key numbers; None without 2050 demand
+    top_categories = {sector: ctx["panel"].top_category(sector, 2050) for sector in (TRANSPORT_NAME, INDUSTRY_NAME)}
+
+    def add(path, view, *args):
+        tasks.setdefault(path, (view, args))
+
+    add("europe/top_countries", "top_countries")
+    for year in years:
+        add(f"europe/demand_maps_{year}", "demand_maps", year)
+    for year in [2030, 2050]:
+        add(f"europe/industry_pies_{year}", "industry_pies", year)
+
+    for country in countries:
+        # Countries are not covered by every data set (e.g. industry workbooks exist for a few countries only)
+        has_transport = not cube.lookup(TRANSPORT_NAME, country).empty
+        has_industry = not cube.lookup(INDUSTRY_NAME, country).empty
+        has_ptx = not cube.lookup('PtX', country).empty
+
+        if has_transport and has_industry:
+            add(f"{country}/country_combined", "country_combined", country)
+
+        # The category maps follow each country's most demanding category in 2050 (no map without 2050 demand)
+        transport_category = top_categories[TRANSPORT_NAME].get(country)
+        industry_category = top_categories[INDUSTRY_NAME].get(country)
+        if has_transport:
+            add(f"{country}/transport_stack", "transport_stack", country)
+            for year in [2025, 2050]:
+                add(f"{country}/transport_pies_{year}", "transport_pies", country, year)
+            if transport_category is not None:
+                add(f"europe/transport_map_{_slug(transport_category)}", "transport_map", transport_category)
+
+        if has_industry:
+            add(f"{country}/industry_bar", "industry_bar", country)
+            if industry_category is not None:
+                add(f"europe/industry_map_{_slug(industry_category)}", "industry_map", industry_category)
+
+        if not has_ptx:
+            continue
+        for focus in focuses:
+            add(f"{country}/ptx_wedge_{_slug(focus)}", "ptx_wedge", country, focus)
+            for year in years:
+                add(f"{country}/ptx_sectors_{year}_{_slug(focus)}", "ptx_sectors", country, year, focus)
+
+    return sorted(tasks.items())
+
+
+def _init_worker(ctx):
+    global _context
+    _context = ctx
+
+
+def render_task(task, out_dir, formats):
+    path, (view, args) = task
+    result = BUILDERS[view](_context, *args)
+
+    figures = result if isinstance(result, tuple) else (result,)
+    names = [f"{path}_{part}" for part in MULTI_FIGURE_PARTS[view]] if len(figures) > 1 else [path]
+
+    written = []
+    for fig, name in zip(figures, names):
+        target = os.path.join(out_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if "html" in formats:
+            fig.write_html(target + ".html", include_plotlyjs="cdn")
+            written.append(target + ".html")
+        if "json" in formats:
+            fig.write_json(target + ".json")
+            written.append(target + ".json")
+    return written
+
+
+def render_all(ctx, tasks, out_dir, formats, workers):
+    if workers <= 1:
+        _init_worker(ctx)
+        return [f for task in tasks for f in render_task(task, out_dir, formats)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+        results = pool.map(render_task, tasks, [out_dir] * len(tasks), [formats] * len(tasks), chunksize=4)
+        return [f for written in results for f in written]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every dashboard figure to static files.")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--format", default="html", help="Comma separated list of html, json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = no pool)")
+    parser.add_argument("--transport-file", default=os.path.join('REMIND', 'Results_REMIND_JRC.csv'))
+    parser.add_argument("--industry-path", default=os.path.join('Results_per_Country'))
+    parser.add_argument("--outputs-path", default=os.path.join('Outputs'))
+    parser.add_argument("--countries", nargs="*", help="Country codes (default: all in the transport data)")
+    parser.add_argument("--years", nargs="*", type=int, default=dashboard_years)
+    parser.add_argument("--focus", nargs="*", default=focus_options)
+    args = parser.parse_args(argv)
+
+    formats = {f.strip() for f in args.format.split(",") if f.strip()}
+
+    start = time.perf_counter()
+    ctx = load_context(args.transport_file, args.industry_path, args.outputs_path)
+    countries = args.countries or sorted(ctx["transport_data"]['Country'].unique())
+    tasks = figure_tasks(ctx, countries, args.years, args.focus)
+    loaded = time.perf_counter()
+
+    written = render_all(ctx, tasks, args.out, formats, args.workers)
+    print(f"Loaded data in {loaded - start:.1f} s, rendered {len(tasks)} figure sets "
+          f"({len(written)} files) in {time.perf_counter() - loaded:.1f} s to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mappings import iso_to_country, categories, transport_fuel_paths
+from process import load_transport_data, load_industry_data, load_combined_outputs
+from schema import compact_frame, memory_report, TRANSPORT_SCHEMA, INDUSTRY_SCHEMA, OUTPUTS_SCHEMA
+
+'''
+Memory report for the opt-in compact schema (schema.py).
+
+Prints the deep memory usage of the transport, industry and PtX output frames before and after
+compact_frame, and the time of a `df['Country'] == country` mask on both. Uses the repository data and
+REMIND/Results_REMIND_JRC.csv when present, otherwise a synthetic REMIND-style transport frame.
+
+Usage: python benchmarks/bench_compact_schema.py [transport_csv]
+'''
+
+
+def synthetic_transport(n_years=31, seed=0):
+    rng = np.random.default_rng(seed)
+    countries = list(iso_to_country) + ["EU27"]
+    cats = categories + transport_fuel_paths
+    index = pd.MultiIndex.from_product([countries, cats, range(2020, 2020 + n_years)], names=["Country", "Category", "Year"])
+    df = index.to_frame(index=False)
+    df["Value"] = rng.uniform(0, 2, len(df))
+    return df
+
+
+def time_mask(df, country, repeat=50):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        df[df["Country"] == country]
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    transport_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root, "REMIND", "Results_REMIND_JRC.csv")
+
+    frames = {
+        "transport": load_transport_data(transport_file) if os.path.exists(transport_file) else synthetic_transport(),
+        "industry": load_industry_data(os.path.join(root, "Results_per_Country")),
+        "outputs": load_combined_outputs(os.path.join(root, "Outputs"))
+    }
+    schemas = {"transport": TRANSPORT_SCHEMA, "industry": INDUSTRY_SCHEMA, "outputs": OUTPUTS_SCHEMA}
+
+    report = memory_report(frames, schemas)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    compact = {name: compact_frame(df, schemas[name]) for name, df in frames.items()}
+    print()
+    for name in frames:
+        print(f"{name:<10} Country mask: {time_mask(frames[name], 'DE'):.3f} ms -> {time_mask(compact[name], 'DE'):.3f} ms")
@@ -0,0 +1,85 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["PTX_CACHE_DIR"] = os.path.join(tempfile.gettempdir(), "ptx_bench_cache")
+
+import plotly.io as pio
+from mappings import dashboard_years, focus_options
+from batch_render import load_context, figure_tasks, BUILDERS, MULTI_FIGURE_PARTS
+from figure_payload import compact_figure_dict, payload_size
+from synthetic_data import add_scale_arguments, write_from_args
+
+'''
+Payload bytes of the dashboard figures before and after compact serialization (figure_payload.py).
+
+Builds the figures of batch_render.py for a few countries with the Streamlit Plotly template applied, as
+st.plotly_chart sends them, and prints the JSON size of each figure as-is, compacted with JSON text arrays
+only (rounding and stripped defaults) and compacted with typed arrays where they are shorter. Uses the repository data when --data is given, otherwise a
+synthetic data set.
+
+Usage: python benchmarks/bench_figure_payload.py [--data DIR] [--countries-shown DE FR ...] [scale options]
+'''
+
+
+def streamlit_template():
+    try:
+        from streamlit.elements.lib.streamlit_plotly_theme import configure_streamlit_plotly_theme
+    except ImportError:
+        return "plotly"
+    configure_streamlit_plotly_theme()
+    return "streamlit"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare figure payload sizes.")
+    parser.add_argument("--data", help="Folder with REMIND/, Results_per_Country/ and Outputs/")
+    parser.add_argument("--countries-shown", nargs="+", default=["DE", "FR"])
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    template = streamlit_template()
+    pio.templates.default = template
+
+    tmp = None
+    if args.data:
+        root = args.data
+    else:
+        tmp = tempfile.mkdtemp(prefix="ptx_payload_")
+        root = tmp
+        write_from_args(root, args)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ctx = load_context(os.path.join(root, "REMIND", "Results_REMIND_JRC.csv"),
+                               os.path.join(root, "Results_per_Country"), os.path.join(root, "Outputs"))
+            tasks = figure_tasks(ctx, args.countries_shown, dashboard_years, focus_options)
+
+            print(f"template={template}, figures of {len(tasks)} tasks")
+            print(f"{'figure':<50} {'original':>10} {'text':>10} {'binary':>10}")
+            totals = [0, 0, 0]
+            for path, (view, task_args) in tasks:
+                result = BUILDERS[view](ctx, *task_args)
+                figures = result if isinstance(result, tuple) else (result,)
+                names = [f"{path}_{part}" for part in MULTI_FIGURE_PARTS[view]] if len(figures) > 1 else [path]
+                for fig, name in zip(figures, names):
+                    fig_dict = fig.to_dict()
+                    sizes = [payload_size(fig_dict),
+                             payload_size(compact_figure_dict(fig_dict, binary=False)),
+                             payload_size(compact_figure_dict(fig_dict))]
+                    totals = [t + s for t, s in zip(totals, sizes)]
+                    print(f"{name:<50} {sizes[0]:>10} {sizes[1]:>10} {sizes[2]:>10}")
+        print(f"{'total':<50} {totals[0]:>10} {totals[1]:>10} {totals[2]:>10}  "
+              f"({100 * (1 - totals[2] / totals[0]):.0f}% smaller)")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
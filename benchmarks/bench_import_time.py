@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+'''
+Import time budget for the Streamlit-free compute core.
+
+Imports the core modules in a fresh interpreter, reports the wall time against IMPORT_BUDGET_S and checks
+that none of Streamlit, Plotly or pycountry was pulled in (they belong to dashboard_layer.py, the plot
+modules and geo.country_table). Exits with status 1 when the budget or the check fails.
+The dashboard layer and the plot modules are timed as well, for reference.
+
+Usage: python benchmarks/bench_import_time.py [repeat]
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measured at about 0.6 s, most of it pandas; importing Streamlit on top adds about 0.4 s
+IMPORT_BUDGET_S = 1.0
+
+CORE_MODULES = ["mappings", "category_index", "geo", "schema", "cache", "process", "manifest", "cube",
+                "aggregations", "figure_cache", "figure_payload",
+                "ranking", "panel", "kpis", "dataset", "warehouse"]
+HEAVY_MODULES = ["streamlit", "plotly", "pycountry"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def time_import(modules, repeat=3):
+    # Best of several fresh interpreters, so the OS file cache is warm
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(modules=modules, heavy=HEAVY_MODULES)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        timings.append(float(out[0]))
+        loaded = out[1].split(",") if len(out) > 1 else []
+    return min(timings), loaded
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    core_time, loaded = time_import(CORE_MODULES, repeat)
+    plots_time, _ = time_import(CORE_MODULES + ["global_plots", "transport_plots", "industry_plots"], repeat)
+    layer_time, _ = time_import(CORE_MODULES + ["dashboard_layer"], repeat)
+
+    print(f"core            {core_time:.3f} s (budget {IMPORT_BUDGET_S:.1f} s)")
+    print(f"core + plots    {plots_time:.3f} s")
+    print(f"core + layer    {layer_time:.3f} s")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: the core imported {', '.join(loaded)}")
+        failed = True
+    if core_time > IMPORT_BUDGET_S:
+        print("FAIL: the core import is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from process import unpivot_industry_sheet
+
+'''
+Benchmark of the industry material x sector unpivot used by load_industry_data.
+
+Compares the former per-cell loop with the vectorized unpivot_industry_sheet on a synthetic
+27-country x 30-year x 50-material input, checks both produce the same frame, and prints the timings.
+
+Usage: python benchmarks/bench_industry_unpivot.py [countries] [years] [materials]
+'''
+
+SECTORS = ["Iron & steel", "Chemicals", "Non-metallic minerals"]
+
+
+def make_sheets(n_countries, n_years, n_materials, seed=0):
+    rng = np.random.default_rng(seed)
+    materials = [f" Material {i} " for i in range(n_materials)]
+    sheets = []
+    for c in range(n_countries):
+        for y in range(n_years):
+            values = rng.uniform(0, 20000, size=(n_materials, len(SECTORS)))
+            # Sparse sheets like the real workbooks: most cells are empty
+            values[rng.random(values.shape) < 0.6] = np.nan
+            sheets.append((2021 + y, f"C{c:02d}", pd.DataFrame(values, index=materials, columns=SECTORS)))
+    return sheets
+
+
+def unpivot_loop(df, year, country):
+    df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
+    industry_data = []
+    for material in df.index:
+        for sector in df.columns:
+            industry_data.append({
+                "Year": int(year),
+                "Country": country,
+                "Category": sector,
+                "Material": material.strip(),
+                "Value": df.loc[material, sector] * 3.6 * 0.000001
+            })
+    return pd.DataFrame(industry_data)
+
+
+def time_unpivot(unpivot, sheets):
+    start = time.perf_counter()
+    frames = [unpivot(df, year, country) for year, country, df in sheets]
+    result = pd.concat(frames, ignore_index=True)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_countries, n_years, n_materials = (int(a) for a in (sys.argv[1:] or [27, 30, 50]))
+    sheets = make_sheets(n_countries, n_years, n_materials)
+
+    loop_df, loop_time = time_unpivot(unpivot_loop, sheets)
+    vec_df, vec_time = time_unpivot(unpivot_industry_sheet, sheets)
+    pd.testing.assert_frame_equal(loop_df, vec_df, check_dtype=False)
+
+    print(f"Input: {n_countries} countries x {n_years} years x {n_materials} materials ({len(vec_df)} rows)")
+    print(f"Per-cell loop: {loop_time:8.3f} s")
+    print(f"Vectorized:    {vec_time:8.3f} s")
+    print(f"Speedup:       {loop_time / vec_time:8.1f}x")
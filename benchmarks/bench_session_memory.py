@@ -0,0 +1,93 @@
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["PTX_CACHE_DIR"] = os.path.join(tempfile.gettempdir(), "ptx_bench_cache")
+
+import pandas as pd
+from mappings import categories, transport_fuel_paths, iso_to_country
+from category_index import category_trie
+from scenarios import ScenarioStore, scenario_paths
+from dataset import private_bytes
+from synthetic_data import add_scale_arguments, write_from_args
+
+'''
+Memory held per dashboard session on top of the shared data set.
+
+Loads a scenario once into a ScenarioStore, then simulates --sessions sessions that each keep the frames of
+one rerun alive, and reports the traced memory retained per session:
+- shared: the sessions take views of the read-only SharedDataset (what dashboard_final.py does now),
+- copies: the sessions get their own copies of the loaded frames, as st.cache_data returns them (a
+  pickle round trip), and add the derived columns themselves (what dashboard_final.py did before).
+
+Usage: python benchmarks/bench_session_memory.py [--data DIR] [--sessions N] [scale options]
+'''
+
+
+def shared_session(store, scenario):
+    frames = store.get(scenario)
+    return frames, private_bytes(frames.dataset, frames.transport, frames.fuel_transport, frames.industry, frames.outputs)
+
+
+def copied_session(store, scenario):
+    frames = store.get(scenario)
+    transport, industry, outputs = (pickle.loads(pickle.dumps(df)) for df in
+                                    (frames.dataset.transport, frames.dataset.industry, frames.dataset.outputs))
+    fuel_transport = pickle.loads(pickle.dumps(frames.dataset.fuel_transport))
+    fuel_transport[["MainCategory", "Fuel"]] = category_trie(tuple(categories)).split_column(fuel_transport["Category"])
+    transport["Country_full"] = transport["Country"].map(iso_to_country)
+    transport["MainCategory"] = transport["Category"]
+    industry["Country_full"] = industry["Country"].map(iso_to_country)
+    return (transport, fuel_transport, industry, outputs), None
+
+
+def measure(session, store, scenario, sessions):
+    kept = [session(store, scenario)]  # first session outside the trace: loads and warms the store
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(sessions):
+        kept.append(session(store, scenario))
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / sessions, kept[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory held per dashboard session.")
+    parser.add_argument("--data", help="Folder with REMIND/, Results_per_Country/ and Outputs/")
+    parser.add_argument("--sessions", type=int, default=20)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    tmp = None
+    if args.data:
+        root = args.data
+    else:
+        tmp = tempfile.mkdtemp(prefix="ptx_sessions_")
+        root = tmp
+        write_from_args(root, args)
+
+    try:
+        warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+        scenario = scenario_paths("bench", root)
+        store = ScenarioStore(max_bytes=float("inf"))
+        dataset = store.get(scenario).dataset
+        print(f"shared data set: {dataset.nbytes() / 1e6:.2f} MB of arrays, {len(dataset.transport)} transport rows")
+
+        for name, session in [("shared", shared_session), ("copies", copied_session)]:
+            per_session, private = measure(session, store, scenario, args.sessions)
+            extra = f", private_bytes {private}" if private is not None else ""
+            print(f"{name:<8} {per_session / 1e3:10.1f} KB retained per session{extra}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
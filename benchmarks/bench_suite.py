@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Parsed workbooks go to a scratch cache, so cold loads never touch the dashboard's own cache
+os.environ["PTX_CACHE_DIR"] = os.path.join(tempfile.gettempdir(), "ptx_bench_cache")
+
+import pandas as pd
+import plotly
+from cache import clear_cache
+from mappings import categories, transport_fuel_paths, industry_categories, focus_options, ptx_carriers
+from process import load_transport_data, load_industry_data, load_combined_outputs
+from aggregations import apply_focus_filter, aggregate_country_demand
+from batch_render import load_context, BUILDERS
+from ranking import RankingIndex
+from panel import DemandPanel
+from kpis import kpi_table, KEY_PERIODS, PTX_PERIODS
+from warehouse import compile_warehouse, Warehouse, SqlRanking
+from synthetic_data import add_scale_arguments, write_from_args
+
+'''
+Benchmark suite for the loaders, aggregations and figure builders on synthetic data.
+
+Writes a synthetic data set (see synthetic_data.py) or uses an existing one (--data), then times:
+- load_transport_data, load_industry_data and load_combined_outputs, the workbook loaders with an empty
+  (cold) and a filled (warm) parse cache,
+- apply_focus_filter for every focus option, aggregate_country_demand for both sectors, building the
+  ranking index and a top-N query against it,
+- building the dense panel, and the PtX share and growth of one country from the cube against every
+  country from the panel, and the KPI table of every country and key period,
+- compiling the demand cube into a warehouse file, opening it as a replica does, and the SQL versions of
+  the KPI sum, the country totals and the top-N query,
+- every figure builder of batch_render.py, with the same inputs as the dashboard.
+
+Each case reports the minimum and median wall time over --repeat runs and the peak traced memory of one
+extra run under tracemalloc. Results go to a JSON file together with the scale, the git commit and the
+library versions; pass an earlier file as --baseline to print the change per case.
+
+Usage: python benchmarks/bench_suite.py [--countries N] [--years N] [--categories N] [--materials N]
+                                         [--data DIR] [--repeat N] [--out FILE] [--baseline FILE]
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Peak memory from a separate run, tracing slows the code down too much to time it
+    if setup:
+        setup()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"wall_s_min": min(timings), "wall_s_median": statistics.median(timings), "peak_mb": peak / 1e6}
+
+
+def benchmark_cases(paths):
+    transport_file, industry_path, outputs_path = paths["transport_file"], paths["industry_path"], paths["outputs_path"]
+    keep = categories + transport_fuel_paths
+
+    cases = [
+        ("loaders", "load_transport_data", lambda: load_transport_data(transport_file, keep_categories=keep), None),
+        ("loaders", "load_industry_data (cold)", lambda: load_industry_data(industry_path), clear_cache),
+        ("loaders", "load_industry_data (warm)", lambda: load_industry_data(industry_path), None),
+        ("loaders", "load_combined_outputs (cold)", lambda: load_combined_outputs(outputs_path), clear_cache),
+        ("loaders", "load_combined_outputs (warm)", lambda: load_combined_outputs(outputs_path), None),
+    ]
+
+    ctx = load_context(transport_file, industry_path, outputs_path)
+    outputs = load_combined_outputs(outputs_path)
+    for focus in focus_options:
+        cases.append(("aggregations", f"apply_focus_filter ({focus})", lambda focus=focus: apply_focus_filter(outputs, focus), None))
+    for sector, df in [("Transport", ctx["transport_data"]), ("Industry", ctx["industry_df"])]:
+        cases.append(("aggregations", f"aggregate_country_demand ({sector})",
+                      lambda df=df, sector=sector: aggregate_country_demand(df, sector), None))
+    cases.append(("aggregations", "RankingIndex.from_cube", lambda: RankingIndex.from_cube(ctx["cube"]), None))
+    cases.append(("aggregations", "RankingIndex.top_series (Transport)", lambda: ctx["ranking"].top_series("Transport"), None))
+
+    panel = DemandPanel.from_cube(ctx["cube"])
+    member = sorted(c for c in ctx["transport_data"]["Country"].unique() if c != "EU27")[0]
+
+    def cube_metrics(country):
+        share = ctx["cube"].total("PtX", country, 2050, fuel=ptx_carriers) / ctx["cube"].total("PtX", country, 2050)
+        return share, ctx["cube"].total("Transport", country, 2030), ctx["cube"].total("Transport", country, 2050)
+
+    cases += [
+        ("panel", "DemandPanel.from_cube", lambda: DemandPanel.from_cube(ctx["cube"]), None),
+        ("panel", "PtX share and growth, 1 country (cube)", lambda: cube_metrics(member), None),
+        ("panel", "PtX share and growth, all countries (panel)",
+         lambda: (panel.shares("PtX", 2050, fuels=ptx_carriers), panel.growth("Transport", 2030, 2050)), None),
+        ("panel", "kpi_table (all countries and periods)", lambda: kpi_table(panel, KEY_PERIODS + PTX_PERIODS), None),
+    ]
+
+    # Warehouse file next to the scratch parse cache
+    warehouse_file = os.path.join(os.environ["PTX_CACHE_DIR"], "bench.sqlite")
+    os.makedirs(os.environ["PTX_CACHE_DIR"], exist_ok=True)
+    countries = sorted(ctx["transport_data"]["Country"].unique())
+    compile_warehouse(ctx["cube"], countries, warehouse_file)
+    warehouse = Warehouse(warehouse_file)
+    cases += [
+        ("warehouse", "compile_warehouse", lambda: compile_warehouse(ctx["cube"], countries, warehouse_file), None),
+        ("warehouse", "Warehouse (replica start)", lambda: Warehouse(warehouse_file), None),
+        ("warehouse", "DemandCube.total (KPI)", lambda: ctx["cube"].total("PtX", "EU27", 2050), None),
+        ("warehouse", "SqlCube.total (KPI)", lambda: warehouse.cube.total("PtX", "EU27", 2050), None),
+        ("warehouse", "DemandCube.rollup (Country, Year)", lambda: ctx["cube"].rollup("Transport", ["Country", "Year"]), None),
+        ("warehouse", "SqlCube.rollup (Country, Year)", lambda: warehouse.cube.rollup("Transport", ["Country", "Year"]), None),
+        ("warehouse", "SqlRanking.top_series (Transport)", lambda: SqlRanking(warehouse).top_series("Transport"), None),
+    ]
+
+    # One representative input per builder: the first member state, the last dashboard year, all carriers
+    country = sorted(c for c in ctx["transport_data"]["Country"].unique() if c != "EU27")[0]
+    year, focus = 2050, focus_options[0]
+    builder_args = {
+        "ptx_wedge": (country, focus),
+        "ptx_sectors": (country, year, focus),
+        "country_combined": (country,),
+        "demand_maps": (year,),
+        "transport_stack": (country,),
+        "transport_pies": (country, year),
+        "transport_map": (categories[0],),
+        "industry_bar": (country,),
+        "industry_pies": (year,),
+        "industry_map": (industry_categories[0],),
+        "top_countries": (),
+    }
+    for view, args in builder_args.items():
+        cases.append(("figures", view, lambda view=view, args=args: BUILDERS[view](ctx, *args), None))
+    return cases
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    with open(baseline_file) as f:
+        baseline = {(r["group"], r["name"]): r for r in json.load(f)["results"]}
+    print(f"\nChange against {baseline_file} (median wall time, peak memory):")
+    for r in results:
+        base = baseline.get((r["group"], r["name"]))
+        if base is None:
+            continue
+        time_change = (r["wall_s_median"] / base["wall_s_median"] - 1) * 100 if base["wall_s_median"] else float("nan")
+        memory_change = (r["peak_mb"] / base["peak_mb"] - 1) * 100 if base["peak_mb"] else float("nan")
+        print(f"{r['name']:<50} {time_change:+7.1f} % {memory_change:+7.1f} %")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the loaders, aggregations and figure builders.")
+    add_scale_arguments(parser)
+    parser.add_argument("--data", help="Existing data folder (REMIND/, Results_per_Country/, Outputs/) instead of synthetic data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="JSON result file (default benchmarks/results/<commit>_<scale>.json)")
+    parser.add_argument("--baseline", help="Earlier JSON result file to compare against")
+    args = parser.parse_args()
+
+    # Some builders assign to filtered frames; the warnings would drown the report
+    warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+
+    if args.data:
+        paths = {
+            "transport_file": os.path.join(args.data, "REMIND", "Results_REMIND_JRC.csv"),
+            "industry_path": os.path.join(args.data, "Results_per_Country"),
+            "outputs_path": os.path.join(args.data, "Outputs")
+        }
+        scale = {"data": os.path.abspath(args.data)}
+        scale_name = os.path.basename(os.path.abspath(args.data))
+        data_dir = None
+    else:
+        data_dir = tempfile.mkdtemp(prefix="ptx_bench_data_")
+        start = time.perf_counter()
+        scale = write_from_args(data_dir, args)
+        paths = {key: scale.pop(key) for key in ["transport_file", "industry_path", "outputs_path"]}
+        print(f"Wrote synthetic data to {data_dir} in {time.perf_counter() - start:.1f} s")
+        scale_name = f"{args.countries}c_{args.years}y_{args.categories}v_{args.materials}m"
+
+    results = []
+    for group, name, func, setup in benchmark_cases(paths):
+        result = {"group": group, "name": name, **measure(func, args.repeat, setup)}
+        results.append(result)
+        print(f"{group:<13} {name:<50} {result['wall_s_median'] * 1000:9.1f} ms {result['peak_mb']:9.1f} MB")
+    clear_cache()
+    if data_dir:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        "repeat": args.repeat,
+        "scale": scale,
+        "results": results
+    }
+    out = args.out or os.path.join(ROOT, "benchmarks", "results", f"{commit or 'unknown'}_{scale_name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.baseline:
+        compare(results, args.baseline)
@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mappings import iso_to_country, categories, transport_fuel_paths, industry_categories, industry_materials
+from mappings import ptx_sectors, fuel_order_full
+
+'''
+Synthetic input data at configurable scale, in the layout of the repository data.
+
+write_dataset creates the three inputs of the dashboard under one root folder:
+- REMIND/Results_REMIND_JRC.csv: long-format export with Country, Category, Year, Value columns. Besides the
+  dashboard categories and fuel paths it holds extra_categories unrelated variables, as the real export does.
+- Results_per_Country/<year>_<country>.xlsx: material x industry sector workbooks (GWh, mostly empty cells).
+- Outputs/PtX_demand_<country>.xlsx: fuel group x sector PtX demand per year (EJ).
+
+The first countries are the EU27 member states of mappings.iso_to_country, further ones get codes X0, X1, ...
+and EU27 is always included. Years run from 2020 in 5-year steps.
+
+Usage: python benchmarks/synthetic_data.py out_dir [--countries N] [--years N] [--categories N] [--materials N]
+'''
+
+
+def country_list(n_countries):
+    members = list(iso_to_country)
+    codes = members[:n_countries] + [f"X{i}" for i in range(max(0, n_countries - len(members)))]
+    return codes + ["EU27"]
+
+
+def year_list(n_years):
+    return [2020 + 5 * i for i in range(n_years)]
+
+
+def material_list(n_materials):
+    return industry_materials[:n_materials] + [f"Material {i}" for i in range(max(0, n_materials - len(industry_materials)))]
+
+
+def transport_frame(countries, years, extra_categories, rng):
+    variables = categories + transport_fuel_paths + [f"FE|Other|Variable {i}" for i in range(extra_categories)]
+    index = pd.MultiIndex.from_product([countries, variables, years], names=["Country", "Category", "Year"])
+    df = index.to_frame(index=False)
+    df["Value"] = rng.uniform(0, 2, len(df))
+    return df
+
+
+def industry_sheet(materials, rng):
+    values = rng.uniform(0, 20000, size=(len(materials), len(industry_categories)))
+    # Like the real workbooks, most material x sector cells are empty
+    values[rng.random(values.shape) < 0.6] = np.nan
+    df = pd.DataFrame(values, index=materials, columns=industry_categories)
+    if "Overall Demand" in df.index:
+        df.loc["Overall Demand"] = df.drop(index="Overall Demand").sum()
+    return df
+
+
+def outputs_sheet(years, rng):
+    frames = []
+    for year in years:
+        values = rng.uniform(0, 0.1, size=(len(fuel_order_full), len(ptx_sectors)))
+        values[rng.random(values.shape) < 0.5] = np.nan
+        df = pd.DataFrame(values, columns=ptx_sectors)
+        df.loc[len(df)] = df.sum()
+        df.insert(0, "FuelGroup", fuel_order_full + ["Overall Demand"])
+        df.insert(1, "Year", year)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_dataset(root, n_countries=27, n_years=7, extra_categories=0, n_materials=len(industry_materials),
+                  workbook_years=None, seed=0):
+    rng = np.random.default_rng(seed)
+    countries = country_list(n_countries)
+    years = year_list(n_years)
+    # Workbooks exist for the dashboard years only, unless asked otherwise
+    workbook_years = workbook_years or [y for y in years if y in (2030, 2040, 2050)] or years
+    materials = material_list(n_materials)
+
+    paths = {
+        "transport_file": os.path.join(root, "REMIND", "Results_REMIND_JRC.csv"),
+        "industry_path": os.path.join(root, "Results_per_Country"),
+        "outputs_path": os.path.join(root, "Outputs")
+    }
+    for path in [os.path.dirname(paths["transport_file"]), paths["industry_path"], paths["outputs_path"]]:
+        os.makedirs(path, exist_ok=True)
+
+    transport = transport_frame(countries, years, extra_categories, rng)
+    transport.to_csv(paths["transport_file"], index=False)
+
+    for country in countries:
+        for year in workbook_years:
+            industry_sheet(materials, rng).to_excel(os.path.join(paths["industry_path"], f"{year}_{country}.xlsx"))
+        outputs_sheet(workbook_years, rng).to_excel(os.path.join(paths["outputs_path"], f"PtX_demand_{country}.xlsx"), index=False)
+
+    return {
+        **paths,
+        "countries": len(countries),
+        "years": len(years),
+        "workbook_years": len(workbook_years),
+        "transport_variables": transport["Category"].nunique(),
+        "transport_rows": len(transport),
+        "materials": len(materials),
+        "workbooks": len(countries) * (len(workbook_years) + 1),
+        "seed": seed
+    }
+
+
+def add_scale_arguments(parser):
+    parser.add_argument("--countries", type=int, default=27, help="Countries besides EU27")
+    parser.add_argument("--years", type=int, default=7, help="Years of the REMIND export, from 2020 in 5-year steps")
+    parser.add_argument("--categories", type=int, default=0, help="Extra REMIND variables not shown in the dashboard")
+    parser.add_argument("--materials", type=int, default=len(industry_materials), help="Rows of the industry workbooks")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def write_from_args(root, args):
+    return write_dataset(root, args.countries, args.years, args.categories, args.materials, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic input data set.")
+    parser.add_argument("out_dir")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    info = write_from_args(args.out_dir, args)
+    print(", ".join(f"{key}={value}" for key, value in info.items() if not key.endswith(("_file", "_path"))))
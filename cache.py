@@ -0,0 +1,91 @@
+import hashlib
+import os
+import pandas as pd
+
+try:
+    from pyarrow import ArrowException
+except ImportError:
+    # No Parquet engine: to_parquet and read_parquet raise ImportError
+    ArrowException = ImportError
+
+'''
+Persistent on-disk cache for the parsed input workbooks.
+
+Each source file is parsed once into a long-format DataFrame and stored as Parquet under CACHE_DIR.
+Entries are keyed on the source path, size and modification time, so only stale workbooks are re-parsed
+and the cache survives process restarts (unlike st.cache_data).
+
+Set the PTX_CACHE_DIR environment variable to move the cache, or to an empty string to disable it.
+
+Functions included:
+- cache_path: Returns the cache file used for a given source file and reader.
+- read_cached: Reads a source file through the cache, re-parsing it only when it changed.
+- clear_cache: Removes every cached entry.
+'''
+
+CACHE_DIR = os.environ.get("PTX_CACHE_DIR", os.path.join(".cache", "ingest"))
+
+# Bump when the long-format layout produced by the readers changes
+CACHE_VERSION = 1
+
+# A read-only disk, a missing Parquet engine or a column Arrow cannot convert (e.g. an object column of mixed
+# types, ArrowTypeError) only costs us the cache, not the data
+CACHE_ERRORS = (OSError, ImportError, ValueError, TypeError, ArrowException)
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _path_prefix(file_path, reader):
+    reader_name = f"{reader.__module__}.{reader.__qualname__}"
+    return _digest(f"{reader_name}|{os.path.abspath(file_path)}")
+
+
+def cache_path(file_path, reader, cache_dir=CACHE_DIR):
+    stat = os.stat(file_path)
+    stamp = _digest(f"{CACHE_VERSION}|{stat.st_size}|{stat.st_mtime_ns}")
+    return os.path.join(cache_dir, f"{_path_prefix(file_path, reader)}-{stamp}.parquet")
+
+
+def _write_entry(target, df):
+    cache_dir = os.path.dirname(target)
+    prefix = os.path.basename(target).split("-")[0]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, target)
+
+        # Drop older entries of the same source file
+        for name in os.listdir(cache_dir):
+            entry = os.path.join(cache_dir, name)
+            if name.startswith(prefix + "-") and name.endswith(".parquet") and entry != target:
+                os.remove(entry)
+    except CACHE_ERRORS:
+        pass
+
+
+def read_cached(file_path, reader, cache_dir=CACHE_DIR):
+    if not cache_dir:
+        return reader(file_path)
+
+    target = cache_path(file_path, reader, cache_dir)
+    if os.path.exists(target):
+        try:
+            return pd.read_parquet(target)
+        except CACHE_ERRORS:
+            pass
+
+    df = reader(file_path)
+    _write_entry(target, df)
+    return df
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            os.remove(os.path.join(cache_dir, name))
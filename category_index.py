@@ -0,0 +1,58 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+'''
+Compiled prefix index over '|' separated REMIND variable paths.
+
+A CategoryTrie is built once from a list of category prefixes (e.g. mappings.categories) and splits a
+variable such as "FE|Transport|Pass|Rail|Liquids|Biomass" into its longest matching prefix
+("FE|Transport|Pass|Rail") and the remainder ("Liquids|Biomass"). Whole columns are split in one
+pass over their unique values instead of a per-row apply.
+
+Functions included:
+- CategoryTrie: Trie over the path segments of a set of prefixes.
+- category_trie: Cached CategoryTrie for a tuple of prefixes.
+'''
+
+_END = None  # Trie key marking a complete prefix (never a path segment)
+
+
+class CategoryTrie:
+    def __init__(self, prefixes, sep="|"):
+        self.sep = sep
+        self.root = {}
+        for prefix in prefixes:
+            node = self.root
+            for part in prefix.split(sep):
+                node = node.setdefault(part, {})
+            node[_END] = prefix
+
+    def split(self, value):
+        # Longest prefix match on whole segments; (None, value) when nothing matches
+        parts = value.split(self.sep)
+        node, match, depth = self.root, None, 0
+        for i, part in enumerate(parts):
+            node = node.get(part)
+            if node is None:
+                break
+            if _END in node:
+                match, depth = node[_END], i + 1
+        if match is None:
+            return None, value
+        return match, self.sep.join(parts[depth:])
+
+    def split_column(self, values, names=("MainCategory", "Fuel")):
+        values = pd.Series(values)
+        codes, uniques = pd.factorize(values)
+        pairs = [self.split(str(v)) for v in uniques]
+
+        # One extra slot so missing values (code -1) map to None
+        main = np.array([p[0] for p in pairs] + [None], dtype=object)
+        rest = np.array([p[1] for p in pairs] + [None], dtype=object)
+        return pd.DataFrame({names[0]: main[codes], names[1]: rest[codes]}, index=values.index)
+
+
+@lru_cache(maxsize=None)
+def category_trie(prefixes, sep="|"):
+    return CategoryTrie(prefixes, sep)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from instrument import timed
+
+'''
+Pre-aggregated demand cube shared by the dashboard widgets.
+
+The transport, industry and PtX output frames are summed once into a single Series indexed by
+(Sector, Country, Year, Category, Fuel). Widgets then read totals through index lookups instead of
+scanning the full frames with boolean masks on every rerun.
+
+Sector is the data set ("Transport", "Industry" or "PtX"). Category and Fuel map to each data set's own
+columns, see SECTOR_COLUMNS; transport rows have no fuel level.
+
+Functions included:
+- DemandCube: The cube with lookup, total, rollup, frame and country_demand methods.
+'''
+
+LEVELS = ["Sector", "Country", "Year", "Category", "Fuel"]
+
+# Sector -> (column stored as Category, column stored as Fuel)
+SECTOR_COLUMNS = {
+    "Transport": ("Category", None),
+    "Industry": ("Category", "Material"),
+    "PtX": ("Sector", "FuelGroup"),
+}
+
+
+def _cube_part(df, sector):
+    category_col, fuel_col = SECTOR_COLUMNS[sector]
+    return pd.DataFrame({
+        "Sector": sector,
+        "Country": df["Country"].astype(str).to_numpy(),
+        "Year": df["Year"].astype(int).to_numpy(),
+        "Category": df[category_col].astype(str).to_numpy(),
+        "Fuel": df[fuel_col].astype(str).to_numpy() if fuel_col else "",
+        "Value": df["Value"].astype(float).to_numpy()
+    })
+
+
+class DemandCube:
+    def __init__(self, values):
+        self.values = values
+        self._labels = {level: set(values.index.get_level_values(level).unique()) for level in LEVELS}
+
+    @classmethod
+    @timed("cube")
+    def from_frames(cls, transport, industry, outputs):
+        parts = [_cube_part(df, sector) for sector, df in
+                 (("Transport", transport), ("Industry", industry), ("PtX", outputs)) if not df.empty]
+        if not parts:
+            return cls(pd.Series(dtype=float, index=pd.MultiIndex.from_tuples([], names=LEVELS)))
+        data = pd.concat(parts, ignore_index=True)
+
+        # Categorical labels keep the order of first appearance (e.g. sector columns of the workbooks)
+        for level in ["Sector", "Country", "Category", "Fuel"]:
+            data[level] = pd.Categorical(data[level], categories=pd.unique(data[level]))
+
+        # min_count=1 keeps cells that are empty in every source row as NaN, like the input frames
+        values = data.groupby(LEVELS, observed=True, sort=True)["Value"].sum(min_count=1)
+        return cls(values)
+
+    def _locs(self, sector, country, year, category, fuel):
+        key = []
+        for level, value in zip(LEVELS, (sector, country, year, category, fuel)):
+            if value is None:
+                key.append(slice(None))
+                continue
+            values = [value] if isinstance(value, (str, int, np.integer)) else list(value)
+            present = [v for v in values if v in self._labels[level]]
+            if not present:
+                return None
+            key.append(present)
+        try:
+            return self.values.index.get_locs(key)
+        except KeyError:
+            # Every label exists, but not in this combination
+            return None
+
+    def lookup(self, sector, country=None, year=None, category=None, fuel=None):
+        locs = self._locs(sector, country, year, category, fuel)
+        return self.values.iloc[locs] if locs is not None else self.values.iloc[:0]
+
+    def total(self, sector, country=None, year=None, category=None, fuel=None):
+        return float(self.lookup(sector, country, year, category, fuel).sum())
+
+    def _to_frame(self, series, sector):
+        # The Sector level is fixed by the query; dropping it also frees the name for the PtX sector column
+        df = series.reset_index().drop(columns="Sector", errors="ignore")
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(str)
+        category_col, fuel_col = SECTOR_COLUMNS[sector]
+        return df.rename(columns={"Category": category_col, "Fuel": fuel_col or "Fuel"})
+
+    def rollup(self, sector, by, country=None, year=None, category=None, fuel=None):
+        selection = self.lookup(sector, country, year, category, fuel)
+        if selection.empty:
+            return self._to_frame(pd.Series(dtype=float, name="Value", index=pd.MultiIndex.from_tuples([], names=by)), sector)
+        grouped = selection.groupby(level=by, observed=True).sum()
+        return self._to_frame(grouped, sector)
+
+    def frame(self, sector, country=None, year=None, category=None):
+        # Full-resolution slice in the sector's own column names
+        df = self._to_frame(self.lookup(sector, country, year, category), sector)
+        if SECTOR_COLUMNS[sector][1] is None:
+            df = df.drop(columns="Fuel")
+        return df
+
+    def country_demand(self, sector, country):
+        # Same outputs as global_plots.get_country_demand
+        df_grouped = self.rollup(sector, ["Year"], country=country)
+        df_grouped["Sector"] = sector
+        return self.frame(sector, country), df_grouped
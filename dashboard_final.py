@@ -20,47 +20,49 @@ from process import *
 from global_plots import * 
 from transport_plots import *
 from industry_plots import *
-
-# Call important files
-transport_file = os.path.join('REMIND', 'Results_REMIND_JRC.csv')
-industry_path = os.path.join('Results_per_Country')
-final_output_path = os.path.join('Outputs')
-
-transport_data = load_transport_data(transport_file)
-industry_df = load_industry_data(industry_path)
-final_df = load_combined_outputs(final_output_path)
-
-fuel_transport = transport_data[transport_data['Category'].isin(transport_fuel_paths)].copy()
-fuel_transport[["MainCategory", "Fuel"]] = fuel_transport["Category"].apply(lambda x: pd.Series(extract_main_and_fuel(x, categories)))
-
-transport_data['Country_full'] = transport_data['Country'].map(iso_to_country)
-transport_data = transport_data[transport_data["Category"].isin(categories)]
-transport_data["MainCategory"] = transport_data["Category"]
-
-industry_df['Country_full'] = industry_df['Country'].map(iso_to_country)
+from schema import COMPACT_SCHEMA
+from scenarios import discover_scenarios, DEFAULT_SCENARIO
+from kpis import kpi_row, kpi_view, format_kpi, category_label, KEY_PERIODS, PTX_PERIODS
+# Streamlit caching and rendering on top of the Streamlit-free modules above
+from dashboard_layer import *
+# Section timings and cache hits, recorded only with PTX_PROFILE=1
+from instrument import start_rerun, section, finish_rerun
+
+start_rerun()
+
+# Session state key of the country selector
+COUNTRY_KEY = "selected_country"
+section("Load data")
+
+# Call important files: the working directory, plus one folder per scenario under scenarios/
+scenarios = discover_scenarios()
+selected_scenario = DEFAULT_SCENARIO
+if len(scenarios) > 1:
+    with st.sidebar:
+        selected_scenario = st.selectbox("Scenario", list(scenarios), index=0)
+
+# A scenario is loaded on first selection and kept while it fits the memory budget.
+# Only the whitelisted REMIND variables are kept while streaming the export, and workbooks are tracked
+# by a manifest: new or changed files are parsed on the next rerun, without a full reload.
+# The three inputs load concurrently; the page is drawn as each of them arrives
+loading = scenario_store(COMPACT_SCHEMA).load(scenarios[selected_scenario])
 transport_name = 'Transport'
 industry_name = 'Industry'
 
+# Figures are cached per exact inputs (LRU, bounded in size), so only changed widgets are rebuilt
+figures = figure_cache()
+
 # -------- Side bar with relevant choices for the dashboard user --------
+section("Sidebar")
 with st.sidebar:
     st.title("Filters")
-    all_countries = sorted(transport_data['Country'].unique())
+    # The country list comes from the transport data, filled in once it has loaded
+    country_slot = st.empty()
 
-    # Set the default country to be EU27
-    default_index = 0
-    if 'EU27' in all_countries:
-        default_index = all_countries.index('EU27')
-    selected_country = st.selectbox("Select a country:", all_countries, index=default_index, format_func=format_country_name)
+    selected_year = st.selectbox("Select a year", dashboard_years, index=2)
 
-    selected_year = st.selectbox("Select a year", [2030, 2040, 2050], index=2)
-
-    focus = st.radio("What is the focus of the analysis?",
-    ["All energy carriers",
-    "Green fuels only",
-    # "Hydrogen only",
-    "Hydrogen vs other Green fuels",
-    "Green fuels vs Fossil fuels"],
-    index=0)
+# Until then the header and PtX charts use the country chosen on the previous rerun (EU27 at first)
+selected_country = st.session_state.get(COUNTRY_KEY, "EU27")
 
 st.markdown("""
 This dashboard explores how final energy demand evolves across Europe and how 
@@ -68,159 +70,241 @@ Green fuels progressively replace fossil energy in transport and industry.
 It first provides a strategic overview of Green fuels integration and total energy demand, and then dives into sector-specific insights for Transport and Industry.
 """)
 
-country_data = final_df[final_df['Country'] == selected_country]
-eu_data = final_df[final_df['Country'] == "EU27"]
+section("Header KPIs")
+# Only the PtX outputs are needed up to the PtX charts
+ptx_data = loading.ptx()
+final_df = ptx_data.outputs
 
-# Calculate metrics for the chose year 
-total_eu = eu_data[eu_data['Year'] == selected_year]['Value'].sum()
-total = country_data[country_data['Year'] == selected_year]['Value'].sum()
-ptx = country_data[(country_data['Year'] == selected_year) & (country_data['FuelGroup'].isin(ptx_carriers))]['Value'].sum()
-share_ptx = (ptx / total * 100) if total > 0 else 0
+# KPIs of every country in one pass; the header reads the selected country and year.
+# Missing values (no data for the country or year, no total demand) show as n/a
+ptx_kpis = kpis(ptx_data.panel, ptx_data.version, tuple(PTX_PERIODS))
+header = kpi_row(ptx_kpis, 'PtX', selected_country, selected_year)
+total = format_kpi(header["EndDemand"], ".2f", " EJ")
+ptx = format_kpi(header["PtXDemand"], ".3f", " EJ")
+share_ptx = format_kpi(header["PtXShare"], ".1f", "%")
 
 
 if selected_country != "EU27":
-    share_country = (total / total_eu * 100) if total_eu > 0 else 0
+    share_country = format_kpi(header["ShareEU27"], ".2f", "%")
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric(f"Total Demand ({selected_year})", f"{total:.2f} EJ")
-    c2.metric(f"Share in EU27 Total demand", f"{share_country:.2f}%")
-    c3.metric(f"Green fuels Demand ({selected_year})", f"{ptx:.3f} EJ")
-    c4.metric(f"Green fuels market share", f"{share_ptx:.1f}%")
+    c1.metric(f"Total Demand ({selected_year})", total)
+    c2.metric(f"Share in EU27 Total demand", share_country)
+    c3.metric(f"Green fuels Demand ({selected_year})", ptx)
+    c4.metric(f"Green fuels market share", share_ptx)
 else:
     # Default PtX KPIs
     c1, c2, c3 = st.columns(3)
-    c1.metric(f"Total Demand ({selected_year})", f"{total:.2f} EJ")
-    c2.metric(f"Green fuels Demand ({selected_year})", f"{ptx:.3f} EJ")
-    c3.metric(f"Green fuels market share", f"{share_ptx:.1f}%")
+    c1.metric(f"Total Demand ({selected_year})", total)
+    c2.metric(f"Green fuels Demand ({selected_year})", ptx)
+    c3.metric(f"Green fuels market share", share_ptx)
 
 
-# Apply focus from the side bar to plot fuel type maps
-st.subheader(f"Energy demand and fuel per sector in {selected_country}")
-filtered_master = apply_focus_filter(
-    final_df[final_df['Country'] == selected_country],
-    focus
-)
+# -------- Sections that rerun on their own --------
+# A widget inside a fragment reruns only that fragment, called again with the arguments of the last full
+# run: the arguments are the inputs the section depends on. The other sections are not recomputed.
 
-if focus in ["Hydrogen vs other Green fuels", "Green fuels vs Fossil fuels"]:
-    color_map = comparison_colors
-else:
-    color_map = ptx_fuel_colors
+@section_fragment("PtX by sector")
+def ptx_section(ptx_data, selected_country, selected_year):
+    # The focus only changes the two charts below, so its choice sits in this section
+    focus = st.radio("What is the focus of the analysis?", focus_options, index=0)
+
+    # Apply focus to plot fuel type maps
+    st.subheader(f"Energy demand and fuel per sector in {selected_country}")
+    color_map = focus_color_map(focus)
+    ptx_cube = ptx_data.cube
+
+    fig_wedge = figures.get(("ptx_wedge", ptx_data.version, selected_country, focus), lambda: plot_ptx_transition_wedge(
+        apply_focus_filter(ptx_cube.frame('PtX', selected_country), focus), selected_country, color_map))
+    fig_sectors = figures.get(("ptx_sectors", ptx_data.version, selected_country, selected_year, focus), lambda: plot_sector_ptx_intensity(
+        apply_focus_filter(ptx_cube.frame('PtX', selected_country), focus), selected_country, selected_year, color_map))
+
+    plotly_chart(fig_wedge,use_container_width=True)
+    plotly_chart(fig_sectors)
 
-st.plotly_chart(plot_ptx_transition_wedge(filtered_master, selected_country, color_map),use_container_width=True)
-st.plotly_chart(plot_sector_ptx_intensity(filtered_master, selected_country, selected_year, color_map))
 
-# European aggregate 
-eu_avg = final_df.groupby(["Year","FuelGroup"])["Value"].sum().reset_index()
-eu_avg["Country"] = "EU27"
+ptx_section(ptx_data, selected_country, selected_year)
+
+section("Wait for data")
+# Transport and industry sections need all three inputs
+scenario_data = loading.frames()
+
+with country_slot:
+    all_countries = scenario_data.dataset.countries
+
+    # Set the default country to be EU27
+    default_index = 0
+    if 'EU27' in all_countries:
+        default_index = all_countries.index('EU27')
+    chosen_country = st.selectbox("Select a country:", all_countries, index=default_index,
+                                  format_func=format_country_name, key=COUNTRY_KEY)
+if chosen_country != selected_country:
+    # EU27 is not in this scenario, or the chosen country is not: redraw the header for the selection
+    st.rerun()
+
+section("Demand cube")
+# Sums per (sector, country, year, category, fuel), rebuilt only when an input changes.
+# From a warehouse file (PTX_WAREHOUSE_DIR) the cube and ranking run their aggregations as SQL
+data_version = scenario_data.version
+cube = scenario_data.cube
+ranking = scenario_data.ranking
+transport_totals = cube.rollup(transport_name, ['Country', 'Year'])
+industry_totals = cube.rollup(industry_name, ['Country', 'Year'])
 
 # -------- EU27 Global energy demand and key numbers --------
+section("Country demand")
 st.subheader(f"{selected_country} Global energy demand")
 
 # Get EU27 data
-country_transport, country_transport_demand = get_country_demand(transport_data, selected_country, transport_name)
-country_industry, country_industry_demand = get_country_demand(industry_df, selected_country,industry_name)
+country_transport, country_transport_demand = cube.country_demand(transport_name, selected_country)
+country_industry, country_industry_demand = cube.country_demand(industry_name, selected_country)
 combined_demand = pd.concat([country_transport_demand, country_industry_demand], ignore_index=True)
 
 # Plot of both sectors
-fig_combined = create_country_combined_plot(country_transport_demand, transport_name, country_industry_demand, industry_name)
-
-# Key metrics
-t_2025 = country_transport_demand[country_transport_demand['Year'] == 2025]['Value'].values[0]
-t_2050 = country_transport_demand[country_transport_demand['Year'] == 2050]['Value'].values[0]
-t_change, t_growth = calculate_growth(t_2025, 2025, t_2050, 2050)
+fig_combined = figures.get(("country_combined", data_version, selected_country), lambda: create_country_combined_plot(
+    country_transport_demand, transport_name, country_industry_demand, industry_name))
 
-i_2030 = country_industry_demand[country_industry_demand['Year'] == 2030]['Value'].values[0]
-i_2050 = country_industry_demand[country_industry_demand['Year'] == 2050]['Value'].values[0]
-i_change, i_growth = calculate_growth(i_2030, 2030, i_2050, 2050)
-
-# Most demanding categories 
-top_transport_2025 = highest_category_info(country_transport, 2025)[1]
-top_transport_2050 = highest_category_info(country_transport, 2050)[1]
-top_industry_2030 = highest_category_info(country_industry, 2030)[1]
-top_industry_2050 = highest_category_info(country_industry, 2050)[1]
+# Key metrics and most demanding categories: transport 2025-2050, industry 2030-2050, for every country in one
+# pass. A year without data or a zero start demand gives n/a instead of an error
+key_kpis = kpis(scenario_data.panel, scenario_data.version, tuple(KEY_PERIODS))
+transport_kpis = kpi_row(key_kpis, transport_name, selected_country)
+industry_kpis = kpi_row(key_kpis, industry_name, selected_country)
 
 graph_eu27, key_num = st.columns((6, 4))
 with graph_eu27:
-    st.plotly_chart(fig_combined, use_container_width=True)
+    plotly_chart(fig_combined, use_container_width=True)
 
 # Second column: Key numbers for global demand
 with key_num:
     st.subheader(transport_name)
-    st.metric("2050 demand", f"{t_2050:.2f} EJ", delta=f"{t_change:.1f} % vs 2025")
+    st.metric("2050 demand", format_kpi(transport_kpis["EndDemand"], ".2f", " EJ"),
+              delta=format_kpi(transport_kpis["Change"], ".1f", " % vs 2025", missing=None))
     st.info(f"""
-            Average annual growth rate: {t_growth:.1f} % \\
-            Top category in 2025: **{top_transport_2025}** \\
-            Top category in 2050: **{top_transport_2050}**
+            Average annual growth rate: {format_kpi(transport_kpis["CAGR"], ".1f", " %")} \\
+            Top category in 2025: **{category_label(transport_kpis["TopCategoryStart"])}** \\
+            Top category in 2050: **{category_label(transport_kpis["TopCategoryEnd"])}**
             """)
     st.markdown('---')
 
     st.subheader(industry_name)
-    st.metric("2050 demand", f"{i_2050:.4f} EJ", delta=f"{i_change:.1f} % vs 2030")
+    st.metric("2050 demand", format_kpi(industry_kpis["EndDemand"], ".4f", " EJ"),
+              delta=format_kpi(industry_kpis["Change"], ".1f", " % vs 2030", missing=None))
     st.info(f"""
-            Average annual growth rate: {i_growth:.1f} % \\
-            Top category in 2030: **{top_industry_2030}** \\
-            Top category in 2050: **{top_industry_2050}**
+            Average annual growth rate: {format_kpi(industry_kpis["CAGR"], ".1f", " %")} \\
+            Top category in 2030: **{category_label(industry_kpis["TopCategoryStart"])}** \\
+            Top category in 2050: **{category_label(industry_kpis["TopCategoryEnd"])}**
             """) 
 st.markdown('---')
 
-# Color sclaes for pie charts
-custom_blues = ['#08306b', '#2171b5', '#6baed6', '#c6dbef', '#deebf7', '#b3cde3', '#a6bddb', '#9ebcda', '#8c96c6']
-custom_reds = ['#67000d', '#cb181d', "#f55c2d"]
-
 # -------- Heatmaps of 2030 demand: Transport vs Industry --------
+section("Demand maps")
 st.subheader("Country-level energy demand by year")
-fig_maps = create_demand_heatmaps(transport_data, industry_df, selected_year)
-st.plotly_chart(fig_maps, use_container_width=True,config= {"scrollZoom": False,"displayModeBar": False})
+fig_maps = figures.get(("demand_maps", data_version, selected_year),
+                       lambda: create_demand_heatmaps(transport_totals, industry_totals, selected_year))
+plotly_chart(fig_maps, use_container_width=True,config= {"scrollZoom": False,"displayModeBar": False})
 
 # ---- Organize dashboard using TABS ----
-tab1, tab2 = st.tabs(["Transport", "Industry"])
-
-with tab1:
-    st.subheader("Evolution of categories - Transport")
-
-    # ----- Bar plot for main categories -----
-    fig_main_transport = plot_main_transport_stack(country_transport, custom_blues)
-    st.plotly_chart(fig_main_transport)
+# Only the open tab is computed; switching tabs reruns this section alone
+@section_fragment("Sector tabs")
+def sector_tabs(cube, data_version, selected_country, country_transport, country_industry, top_transport, top_industry):
+    tab1, tab2 = st.tabs(["Transport", "Industry"], key="sector_tab", on_change="rerun")
+
+    if tab1.open:
+        with tab1:
+            section("Transport tab")
+            st.subheader("Evolution of categories - Transport")
+
+            if country_transport.empty:
+                st.info(f"No transport data for {selected_country}")
+            else:
+                # ----- Bar plot for main categories -----
+                fig_main_transport = figures.get(("transport_stack", data_version, selected_country),
+                                                 lambda: plot_main_transport_stack(country_transport, custom_blues))
+                plotly_chart(fig_main_transport)
+
+                # ----- Pie chars for categories -----
+                for pie_year in [2025, 2050]:
+                    show_pie_pair(figures.get(("transport_pies", data_version, selected_country, pie_year),
+                                              lambda: create_transport_pie_charts(country_transport, pie_year)))
+
+            # ------ Heat maps for most consuming category (none without 2050 demand) --------
+            target_category = top_transport
+            if target_category is not None:
+                fig_cat_transport = figures.get(("transport_map", data_version, target_category),
+                                                lambda: plot_transport_heatmap(cube.frame(transport_name, category=target_category),
+                                                                               target_category))
+                plotly_chart(fig_cat_transport, use_container_width = True, config= {"scrollZoom": False,"displayModeBar": False})
+
+
+            # Debug 
+            # st.write("TEST TO SEE")
+            # st.write(final_df[final_df["Country"] == selected_country][["Year","FuelGroup","Value"]].head(20))
+
+    if tab2.open:
+        with tab2:
+            section("Industry tab")
+            st.subheader("Evolution of categories - Industry")
+
+            # ----- Bar plot for main categories -----
+            if country_industry.empty:
+                st.info(f"No industry data for {selected_country}")
+            else:
+                fig_main_industry = figures.get(("industry_bar", data_version, selected_country),
+                                                lambda: plot_main_industry_bar(country_industry, custom_reds))
+                plotly_chart(fig_main_industry)
+
+            # ----- Pie chars for categories -----
+            for pie_year in [2030, 2050]:
+                show_pie_pair(figures.get(("industry_pies", data_version, pie_year), lambda: create_industry_pie_charts(
+                    cube.rollup(industry_name, ['Year', 'Category', 'Fuel'], year=pie_year), pie_year)))
+
+            # ------ Heat maps for most consuming category (none without 2050 demand) --------
+            target_industry_category = top_industry
+            if target_industry_category is not None:
+                fig_cat_industry = figures.get(("industry_map", data_version, target_industry_category),
+                                               lambda: plot_industry_choropleth(cube.frame(industry_name, category=target_industry_category),
+                                                                                target_industry_category))
+                plotly_chart(fig_cat_industry, use_container_width=True,config= {"scrollZoom": False,"displayModeBar": False})
+
+
+sector_tabs(cube, data_version, selected_country, country_transport, country_industry, transport_kpis["TopCategoryEnd"],
+            industry_kpis["TopCategoryEnd"])
 
-    # ----- Pie chars for categories -----
-    plot_transport_pie_charts(country_transport, 2025)
-    plot_transport_pie_charts(country_transport, 2050)
-
-    # ------ Heat maps for most consuming category --------
-    target_category = highest_category_info(country_transport, 2050)[0]
-    fig_cat_transport = plot_transport_heatmap(transport_data, target_category)
-    st.plotly_chart(fig_cat_transport, use_container_width = True, config= {"scrollZoom": False,"displayModeBar": False})
 
+# -------- Energy demand by most consuming countries --------
+@section_fragment("Top countries")
+def top_countries_section(ranking, data_version):
+    st.subheader("Most energy-demanding countries over time")
 
-    # Debug 
-    # st.write("TEST TO SEE")
-    # st.write(final_df[final_df["Country"] == selected_country][["Year","FuelGroup","Value"]].head(20))
+    # Rankings come from the index built with the cube, so changing N does not regroup the data
+    top_n = st.slider("Number of countries", min_value=3, max_value=10, value=5)
+    fig_transport, fig_industry = figures.get(("top_countries", data_version, top_n),
+                                              lambda: create_top_demanding_countries_figures(ranking, top_n))
 
+    col1, col2 = st.columns(2)
+    with col1:
+        plotly_chart(fig_transport)
+    with col2:
+        plotly_chart(fig_industry)
 
-with tab2:
-    st.subheader("Evolution of categories - Industry")
 
-    # ----- Bar plot for main categories -----
-    fig_main_industry = plot_main_industry_bar(country_industry, custom_reds)
-    st.plotly_chart(fig_main_industry)
+top_countries_section(ranking, data_version)
 
-    # ----- Pie chars for categories -----
-    plot_industry_pie(industry_df, 2030)
-    plot_industry_pie(industry_df, 2050)
 
-    # ------ Heat maps for most consuming category --------
-    target_industry_category = top_industry_2050
-    fig_cat_industry = plot_industry_choropleth(industry_df, target_industry_category)
-    st.plotly_chart(fig_cat_industry, use_container_width=True,config= {"scrollZoom": False,"displayModeBar": False})
+# -------- Key numbers of every country --------
+@section_fragment("All countries")
+def kpi_overview(kpis):
+    st.subheader("Key numbers for all countries")
 
+    # Same table as the key numbers above; click a column header to sort
+    sector = st.radio("Sector", list(dict.fromkeys(kpis["Sector"])), horizontal=True, key="kpi_sector")
+    st.dataframe(kpi_view(kpis[kpis["Sector"] == sector]), hide_index=True, use_container_width=True)
 
-# -------- Energy demand by most consuming countries --------
-st.subheader("Most energy-demanding countries over time")
 
-fig_transport, fig_industry = create_top_demanding_countries_figures(transport_data, industry_df)
+kpi_overview(pd.concat([key_kpis, ptx_kpis], ignore_index=True))
 
-col1, col2 = st.columns(2)
-with col1:
-    st.plotly_chart(fig_transport)
-with col2:
-    st.plotly_chart(fig_industry)
+# Memory this session holds on top of the shared data set, measured only when profiling
+session_memory = lambda: {"private_bytes": private_bytes(scenario_data.dataset, scenario_data.transport,
+                                                          scenario_data.fuel_transport, scenario_data.industry, final_df),
+                          "shared_bytes": scenario_data.dataset.nbytes()}
+show_profile_panel(finish_rerun(), figures, scenario_store(COMPACT_SCHEMA), memory=session_memory)
@@ -0,0 +1,149 @@
+import functools
+import pandas as pd
+import streamlit as st
+import plotly.graph_objects as go
+
+import process
+from figure_cache import FigureCache, FIGURE_CACHE_MB
+from scenarios import ScenarioStore, SCENARIO_CACHE_MB, discover_scenarios
+from dataset import private_bytes
+from kpis import kpi_table
+from instrument import track_cache, milestone, section, start_rerun, finish_rerun, current_rerun, PROFILE
+from figure_payload import compact_figure_dict, COMPACT_FIGURES
+
+'''
+Streamlit layer of the dashboard.
+
+The loaders, cube, manifest and figure cache modules do not import Streamlit, so batch_render.py, the
+benchmarks and worker processes can use them without a Streamlit runtime. This module adds the
+st.cache_data / st.cache_resource wrappers and the st.* rendering helpers on top of them; only
+dashboard_final.py imports it.
+
+Functions included:
+- format_country_name: Country selector labels (st.cache_data).
+- kpis: KPI table of a panel, computed once per data version and periods (st.cache_resource).
+- figure_cache: Process-wide FigureCache (st.cache_resource), holding the compact figures with PTX_COMPACT_FIGURES=1.
+- scenario_store: Process-wide ScenarioStore (st.cache_resource).
+- plotly_chart: st.plotly_chart, sending the compact figure spec when PTX_COMPACT_FIGURES=1.
+- CompactFigureCache: FigureCache of compact figures, built once per figure key.
+- section_fragment: st.fragment for a dashboard section, profiled as its own rerun when it reruns alone.
+- show_pie_pair: Displays two pie charts side by side.
+- show_profile_panel: Sidebar panel with the timings, cache hits and session memory of the rerun (PTX_PROFILE=1).
+'''
+
+# ---- Cached data ----
+# The scenario frames are loaded by the ScenarioStore (see scenario_store)
+format_country_name = st.cache_data(process.format_country_name)
+
+
+# KPI tables kept: the two period sets (key numbers and PtX) of every scenario, plus the previous data version
+# of one scenario while sessions switch to a new data drop
+KPI_CACHE_ENTRIES = 2 * len(discover_scenarios()) + 2
+
+
+@st.cache_resource(max_entries=KPI_CACHE_ENTRIES)
+def _kpis(_panel, data_version, periods):
+    # Shared by every session, which only read it; tables of older data versions are evicted with their panels
+    return kpi_table(_panel, list(periods))
+
+
+kpis = track_cache(_kpis, "kpi_table")
+
+
+@st.cache_resource
+def figure_cache():
+    cache_type = CompactFigureCache if COMPACT_FIGURES else FigureCache
+    return cache_type(int(FIGURE_CACHE_MB * 1e6))
+
+
+@st.cache_resource
+def scenario_store(compact=False):
+    return ScenarioStore(int(SCENARIO_CACHE_MB * 1e6), compact)
+
+
+# ---- Rendering helpers ----
+class CompactFigure(go.Figure):
+    # st.plotly_chart takes a dict, a list or a plotly figure, and sends to_dict() of a figure as is; a dict
+    # would be validated again, and plotly rejects the typed arrays. An empty, fully set up figure that
+    # returns the compact spec from to_dict()
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = spec
+
+    @property
+    def spec(self):
+        return self._spec
+
+    def to_dict(self):
+        return self._spec
+
+
+def compact_figures(fig):
+    # CompactFigure of a figure, or of each figure built together
+    if isinstance(fig, tuple):
+        return tuple(compact_figures(f) for f in fig)
+    return fig if isinstance(fig, CompactFigure) else CompactFigure(compact_figure_dict(fig.to_dict()))
+
+
+class CompactFigureCache(FigureCache):
+    # Holds the compact figures under (*key, "compact"), so a hit is sent without converting the figure again
+    def get(self, key, build):
+        return super().get((*key, "compact"), lambda: compact_figures(build()))
+
+
+def plotly_chart(fig, **kwargs):
+    if COMPACT_FIGURES:
+        fig = compact_figures(fig)
+    chart = st.plotly_chart(fig, **kwargs)
+    # Time to first chart of the rerun, with PTX_PROFILE=1
+    milestone("first chart")
+    return chart
+
+
+def section_fragment(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            # A fragment rerun does not run the script, so it starts and logs a rerun of its own
+            alone = PROFILE and current_rerun() is None
+            if alone:
+                start_rerun(name)
+            section(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if alone:
+                    finish_rerun()
+        return st.fragment(run)
+    return decorate
+
+
+def show_pie_pair(pies):
+    col1, col2 = st.columns(2)
+    with col1:
+        plotly_chart(pies[0])
+    with col2:
+        plotly_chart(pies[1])
+
+
+# ---- Debug panel ----
+def show_profile_panel(rerun, *caches, memory=None):
+    # memory: callable returning the session memory, only called when the panel is shown
+    if rerun is None:
+        return
+    records = pd.DataFrame(rerun.records)
+    with st.sidebar.expander("Performance"):
+        st.caption(f"Rerun {rerun.id}: {rerun.total_ms():.0f} ms")
+        for name, wall_ms in rerun.milestones.items():
+            st.caption(f"{name.capitalize()}: {wall_ms:.0f} ms")
+        if records.empty:
+            return
+        sections = records[records["kind"] == "section"]
+        st.dataframe(sections[["name", "wall_ms"]], hide_index=True)
+        calls = records[records["kind"] != "section"].astype({"rows": "Int64"})
+        st.dataframe(calls[["section", "kind", "name", "wall_ms", "rows", "cache"]], hide_index=True)
+        # Figure cache and scenario store counters
+        for cache in caches:
+            st.json(cache.stats())
+        if memory is not None:
+            st.json(memory())
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from mappings import categories, transport_fuel_paths, iso_to_country
+from category_index import category_trie
+from cube import DemandCube
+from ranking import RankingIndex
+from panel import DemandPanel
+from geo import resolve_codes
+
+'''
+Read-only data set shared by every dashboard session.
+
+The dashboard used to enrich its frames per session (Country_full, MainCategory, the fuel split of the
+transport paths), on top of its own copies of the loaded frames. A SharedDataset holds the enriched
+frames, the demand cube, the dense panel and the ranking index of one data version once per process:
+- the numpy arrays behind its frames are marked read-only, so an in-place write (df.loc[...] = ...,
+  df[col].values[...] = ...) raises instead of changing the data of every session,
+- view() hands out shallow copies: new DataFrame objects over the same arrays. A session can add or
+  replace columns of its view without touching the shared frames, and without copying any data.
+
+private_bytes reports the memory a session holds on top of the shared arrays.
+
+Functions included:
+- freeze: Marks the numpy arrays of a frame or series read-only.
+- SharedDataset: Enriched frames, cube, panel and ranking of one data version, handed out as views.
+- private_bytes: Bytes of the given frames that are not shared with a data set.
+'''
+
+
+def _arrays(obj):
+    # pandas has no public accessor for the arrays behind a frame, _mgr.arrays is the stable internal one
+    arrays = obj._mgr.arrays if isinstance(obj, pd.DataFrame) else [obj._values]
+    for arr in arrays:
+        if isinstance(arr, pd.Categorical):
+            arr = arr.codes
+        if isinstance(arr, np.ndarray):
+            yield arr
+
+
+def freeze(obj):
+    for arr in _arrays(obj):
+        arr.flags.writeable = False
+    return obj
+
+
+def _address(arr):
+    # Start of the memory an array views (the base array's buffer for views)
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr.__array_interface__["data"][0]
+
+
+def enrich_transport(transport):
+    # Dashboard categories with their full country names; MainCategory is the category itself
+    data = transport[transport["Category"].isin(categories)].copy()
+    data["Country_full"] = data["Country"].map(iso_to_country)
+    data["MainCategory"] = data["Category"]
+    return data
+
+
+def enrich_fuel_transport(transport):
+    # Fuel paths split into the dashboard category and the fuel
+    data = transport[transport["Category"].isin(transport_fuel_paths)].copy()
+    data[["MainCategory", "Fuel"]] = category_trie(tuple(categories)).split_column(data["Category"])
+    return data
+
+
+def enrich_industry(industry):
+    data = industry.copy(deep=False)
+    if "Country" in data:
+        data["Country_full"] = data["Country"].map(iso_to_country)
+    return data
+
+
+class SharedDataset:
+    FRAMES = ["transport", "fuel_transport", "industry", "outputs"]
+
+    def __init__(self, transport, fuel_transport, industry, outputs, cube, panel, ranking, version, countries):
+        self.countries = countries
+        self.transport = freeze(transport)
+        self.fuel_transport = freeze(fuel_transport)
+        self.industry = freeze(industry)
+        self.outputs = freeze(outputs)
+        self.cube = cube
+        freeze(cube.values)
+        self.panel = panel.freeze()
+        self.ranking = ranking
+        self.version = version
+        self._addresses = {_address(arr) for obj in self.objects() for arr in _arrays(obj)}
+
+    @classmethod
+    def build(cls, transport, industry, outputs, version):
+        transport_data = enrich_transport(transport)
+        cube = DemandCube.from_frames(transport_data, industry, outputs)
+        # Countries of the whole REMIND export, for the country selector
+        countries = sorted(transport["Country"].unique())
+        panel = DemandPanel.from_cube(cube)
+        # Map codes of every country in the data, so the maps do not resolve them on the request path
+        resolve_codes(panel.countries)
+        return cls(transport_data, enrich_fuel_transport(transport), enrich_industry(industry), outputs,
+                   cube, panel, RankingIndex.from_panel(panel), version, countries)
+
+    def objects(self):
+        return [getattr(self, name) for name in self.FRAMES] + [self.cube.values]
+
+    def nbytes(self):
+        return sum(arr.nbytes for obj in self.objects() for arr in _arrays(obj)) + self.panel.nbytes()
+
+    def view(self, name):
+        return getattr(self, name).copy(deep=False)
+
+    def shares(self, arr):
+        return _address(arr) in self._addresses
+
+
+def private_bytes(dataset, *frames):
+    # Arrays that are not views of the data set, e.g. filtered copies or columns added by the session
+    size = 0
+    for frame in frames:
+        if frame is None:
+            continue
+        for arr in _arrays(frame):
+            if not dataset.shares(arr):
+                size += arr.nbytes
+    return size
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+from instrument import record
+
+'''
+Bounded LRU cache for the dashboard's Plotly figures.
+
+Figures are keyed on the exact inputs they depend on, e.g. ("ptx_wedge", data_version, country, focus),
+so a sidebar change only rebuilds the figures whose inputs changed and flipping back to a previous
+country is served from memory. The cache is shared by all sessions of the process and bounded by the
+serialized size of the figures it holds, estimated without serializing them; the least recently used
+figures are evicted first.
+
+Set PTX_FIGURE_CACHE_MB to change the bound (default 64 MB, 0 disables caching).
+
+Functions included:
+- FigureCache: The LRU cache with hit/miss counters.
+- figure_size: Estimated serialized size of a figure or figure dict.
+'''
+
+FIGURE_CACHE_MB = float(os.environ.get("PTX_FIGURE_CACHE_MB", "64"))
+
+
+def _json_size(obj):
+    # Approximate length of the JSON of a value: numbers count 8 bytes, numeric arrays their item size plus separators
+    if isinstance(obj, dict):
+        return sum(len(key) + 4 + _json_size(value) for key, value in obj.items()) + 2
+    if isinstance(obj, (list, tuple)):
+        return sum(_json_size(value) + 1 for value in obj) + 2
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in "biuf":
+            return obj.size * (obj.itemsize + 2)
+        return _json_size(obj.tolist())
+    if isinstance(obj, str):
+        return len(obj) + 2
+    return 8
+
+
+def figure_size(fig):
+    # Within a few percent of len(pio.to_json(fig)) at a fraction of the cost: the figure's own data and layout
+    # dicts are walked as they are, without the deep copy of to_dict(). Tuples are figures built together
+    if isinstance(fig, (tuple, list)):
+        return sum(figure_size(f) for f in fig)
+    if isinstance(fig, dict):
+        return _json_size(fig)
+    # Figures that carry their JSON spec (dashboard_layer.CompactFigure) are sized by it
+    spec = getattr(fig, "spec", None)
+    if isinstance(spec, dict):
+        return _json_size(spec)
+    return _json_size({"data": list(fig._data), "layout": fig._layout})
+
+
+class FigureCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (figure, size in bytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record(str(key[0]), "figure_cache", 0.0, cache="hit")
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock so sessions do not wait on each other's figures
+        start = time.perf_counter()
+        fig = build()
+        record(str(key[0]), "figure_cache", time.perf_counter() - start, cache="miss")
+        if self.max_bytes <= 0:
+            return fig
+        size = figure_size(fig)
+        if size > self.max_bytes:
+            return fig
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (fig, size)
+                self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
@@ -0,0 +1,127 @@
+import base64
+import json
+import os
+import re
+import numpy as np
+
+'''
+Compact serialization of the dashboard figures for the browser.
+
+compact_figure_dict rewrites the dict of a Plotly figure (fig.to_dict()) before it is sent:
+- Numeric trace arrays are rounded to the precision the chart displays: the decimals of the trace's
+  hovertemplate (e.g. %{y:.3f} -> 3 decimals), otherwise FIGURE_DIGITS significant digits. Values span
+  1e-9 to 10 EJ, so hover decimals are extended to keep CHART_DIGITS significant digits of the largest
+  value: the charts of small countries keep their shape, they just read 0.000 on hover as before.
+- Arrays of BINARY_MIN_LENGTH values or more are sent as plotly.js typed arrays ({"dtype", "bdata"}) when
+  that is shorter than their JSON text; rounded values with few decimals are often shorter as text.
+- Defaults that add nothing are dropped: the Streamlit template's settings for trace types the figure does
+  not use, and subplot references that point at the default subplot ("x", "y", "geo").
+
+Set PTX_COMPACT_FIGURES=1 to send the dashboard figures this way (see dashboard_layer.plotly_chart).
+
+Functions included:
+- compact_figure_dict: The compact dict of a figure dict.
+- payload_size: Bytes of the JSON sent for a figure or figure dict.
+'''
+
+COMPACT_FIGURES = os.environ.get("PTX_COMPACT_FIGURES", "").lower() in ("1", "true", "yes")
+
+# Significant digits kept for arrays without a hover format
+FIGURE_DIGITS = 6
+
+# Significant digits of the largest value kept when rounding to hover decimals
+CHART_DIGITS = 3
+
+# Shorter arrays stay JSON text: the typed-array wrapper would cost more than it saves
+BINARY_MIN_LENGTH = 8
+
+# Subplot references equal to the plotly.js defaults
+DEFAULT_SUBPLOTS = {"xaxis": "x", "yaxis": "y", "geo": "geo"}
+
+_HOVER_DECIMALS = re.compile(r"%\{(\w+):[,+]?\.(\d+)f\}")
+_INT_TYPES = [("i1", np.int8), ("i2", np.int16), ("i4", np.int32)]
+
+
+def hover_decimals(trace):
+    # e.g. "Demand: %{y:.3f} EJ" -> {"y": 3}
+    template = trace.get("hovertemplate")
+    if not isinstance(template, str):
+        return {}
+    return {name: int(decimals) for name, decimals in _HOVER_DECIMALS.findall(template)}
+
+
+def _numeric_array(value):
+    if not isinstance(value, (list, tuple, np.ndarray)) or len(value) == 0:
+        return None
+    arr = np.asarray(value)
+    return arr if arr.ndim == 1 and arr.dtype.kind in "iuf" else None
+
+
+def round_values(values, decimals=None, digits=FIGURE_DIGITS):
+    values = values.astype(float)
+    if decimals is not None:
+        finite = np.abs(values[np.isfinite(values)])
+        largest = finite.max() if len(finite) else 0
+        if largest > 0:
+            decimals = max(decimals, CHART_DIGITS - 1 - int(np.floor(np.log10(largest))))
+        return np.round(values, decimals), decimals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    scale = np.where(np.isfinite(magnitude), digits - 1 - magnitude, 0)
+    return np.round(values * 10.0 ** scale) / 10.0 ** scale, None
+
+
+def encode_array(values, decimals=None):
+    if values.dtype.kind in "iu":
+        for dtype, np_type in _INT_TYPES:
+            info = np.iinfo(np_type)
+            if values.min() >= info.min and values.max() <= info.max:
+                return {"dtype": dtype, "bdata": base64.b64encode(values.astype(np_type).tobytes()).decode("ascii")}
+        return values.tolist()
+
+    # float32 keeps 7 significant digits: enough unless large values also need several decimals
+    finite = np.abs(values[np.isfinite(values)])
+    largest = finite.max() if len(finite) else 0
+    single = decimals is None or largest * 10.0 ** decimals < 1e7
+    np_type, dtype = (np.float32, "f4") if single else (np.float64, "f8")
+    return {"dtype": dtype, "bdata": base64.b64encode(values.astype(np_type).tobytes()).decode("ascii")}
+
+
+def compact_trace(trace, digits=FIGURE_DIGITS, binary=True):
+    decimals = hover_decimals(trace)
+    compact = {}
+    for key, value in trace.items():
+        if key in DEFAULT_SUBPLOTS and value == DEFAULT_SUBPLOTS[key]:
+            continue
+        arr = _numeric_array(value)
+        if arr is None:
+            compact[key] = value
+            continue
+        places = None
+        if arr.dtype.kind == "f":
+            arr, places = round_values(arr, decimals.get(key), digits)
+        compact[key] = arr.tolist()
+        if binary and len(arr) >= BINARY_MIN_LENGTH:
+            encoded = encode_array(arr, places)
+            if len(json.dumps(encoded)) < len(json.dumps(compact[key])):
+                compact[key] = encoded
+    return compact
+
+
+def compact_figure_dict(fig_dict, digits=FIGURE_DIGITS, binary=True):
+    data = [compact_trace(trace, digits, binary) for trace in fig_dict.get("data", [])]
+    layout = dict(fig_dict.get("layout", {}))
+
+    template = layout.get("template")
+    if isinstance(template, dict) and isinstance(template.get("data"), dict):
+        used = {trace.get("type", "scatter") for trace in data}
+        layout["template"] = dict(template, data={k: v for k, v in template["data"].items() if k in used})
+
+    return dict(fig_dict, data=data, layout=layout)
+
+
+def payload_size(fig):
+    from plotly.utils import PlotlyJSONEncoder
+
+    fig_dict = fig if isinstance(fig, dict) else fig.to_dict()
+    return len(json.dumps(fig_dict, cls=PlotlyJSONEncoder, separators=(",", ":")))
@@ -0,0 +1,65 @@
+from functools import lru_cache
+import pandas as pd
+
+from mappings import iso_to_country
+
+'''
+Country dimension table for the Europe maps.
+
+The table is built once from mappings.iso_to_country and maps every input code to its ISO alpha-2 and
+alpha-3 codes, display name and EU27 membership. Eurostat codes that differ from ISO 3166 ('EL' for
+Greece) and aggregates such as 'EU27' are resolved explicitly, so no country silently drops out of the maps.
+
+The maps get their frames from the demand cube, so the alpha-3 codes are looked up per figure rather than
+stored as a column of the enriched frames. The lookup is resolved when a data set is loaded
+(dataset.SharedDataset.build, warehouse.Warehouse): the table is built and the codes of every country in
+the data are resolved there, and the maps only read a dict. pycountry is imported on the request path only
+for a code that the loaded data did not contain.
+
+Functions included:
+- country_table: The country dimension table, indexed by input code.
+- resolve_codes: Resolves the alpha-3 codes of the given input codes once, e.g. when a data set is loaded.
+- alpha3_codes: Vectorized input code -> ISO alpha-3 lookup for a Series.
+'''
+
+# Eurostat codes that differ from ISO 3166-1 alpha-2
+EUROSTAT_TO_ISO2 = {"EL": "GR", "UK": "GB"}
+
+# Aggregates reported next to the member states; they have no map geometry
+EU_AGGREGATES = {"EU27": "European Union"}
+
+
+def _resolve(code):
+    import pycountry
+
+    alpha2 = EUROSTAT_TO_ISO2.get(code, code)
+    country = pycountry.countries.get(alpha_2=alpha2) if isinstance(alpha2, str) and len(alpha2) == 2 else None
+    return (alpha2, country.alpha_3) if country else (None, None)
+
+
+@lru_cache(maxsize=1)
+def country_table():
+    rows = []
+    for code, name in iso_to_country.items():
+        alpha2, alpha3 = _resolve(code)
+        rows.append({"Code": code, "Alpha2": alpha2, "Alpha3": alpha3, "Name": name, "EU27": True, "Aggregate": False})
+    for code, name in EU_AGGREGATES.items():
+        rows.append({"Code": code, "Alpha2": None, "Alpha3": None, "Name": name, "EU27": False, "Aggregate": True})
+    return pd.DataFrame(rows).set_index("Code")
+
+
+# Input code -> alpha-3 code (None without one) of the table and of every code resolved since
+_alpha3 = {}
+
+
+def resolve_codes(codes):
+    if not _alpha3:
+        _alpha3.update(country_table()["Alpha3"].to_dict())
+    for code in pd.unique(pd.Series(codes, dtype=object)):
+        if code not in _alpha3:
+            _alpha3[code] = _resolve(code)[1]
+    return _alpha3
+
+
+def alpha3_codes(codes):
+    return pd.Series(codes).map(resolve_codes(codes)).astype(object)
@@ -0,0 +1,186 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+'''
+Opt-in timing and cache-hit instrumentation for the dashboard reruns.
+
+Set PTX_PROFILE=1 to record, for every rerun of dashboard_final.py:
+- the wall time of each section of the script (section() marks where the next section starts),
+- the wall time and rows of every loader, transform and figure builder decorated with timed(),
+- cache hits and misses of the st.cache_data loaders and of the figure cache,
+- milestones of the rerun, such as the time to the first chart sent to the browser.
+The records are shown in a sidebar panel (dashboard_layer.show_profile_panel) and written as one JSON
+line per record to the "ptx.profile" logger (stderr, or the file named by PTX_PROFILE_LOG).
+
+When PTX_PROFILE is not set, timed() returns the function unchanged and section() / record() return
+immediately, so the instrumentation costs a function call per section and nothing per builder.
+
+Functions included:
+- timed: Decorator recording wall time and rows of a loader, transform or figure builder.
+- track_cache: Wraps a cached function to record cache hits and misses.
+- start_rerun / section / finish_rerun: Rerun and section boundaries of the dashboard script.
+- record: Adds a record to the rerun of the current thread.
+- milestone: Records the time since the rerun started, the first time a milestone is reached.
+- bind: Wraps a function so it records into the caller's rerun when run in another thread.
+'''
+
+PROFILE = os.environ.get("PTX_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_LOG = os.environ.get("PTX_PROFILE_LOG", "")
+
+logger = logging.getLogger("ptx.profile")
+
+# Streamlit runs each session's script in its own thread
+_local = threading.local()
+_rerun_ids = iter(range(1, sys.maxsize))
+
+
+class Rerun:
+    def __init__(self, label):
+        self.id = next(_rerun_ids)
+        self.label = label
+        self.start = time.perf_counter()
+        self.records = []
+        self.section = None
+        self._section_start = self.start
+        self.milestones = {}
+
+    def add(self, name, kind, wall_s, rows=None, cache=None):
+        self.records.append({"rerun": self.id, "section": self.section, "kind": kind, "name": name,
+                             "wall_ms": round(wall_s * 1000, 3), "rows": rows, "cache": cache})
+
+    def begin_section(self, name):
+        now = time.perf_counter()
+        if self.section is not None:
+            self.add(self.section, "section", now - self._section_start)
+        self.section, self._section_start = name, now
+
+    def reach(self, name):
+        if name not in self.milestones:
+            self.milestones[name] = round((time.perf_counter() - self.start) * 1000, 3)
+            self.add(name, "milestone", self.milestones[name] / 1000)
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.start) * 1000, 3)
+
+
+def _configure_logger():
+    if logger.handlers:
+        return
+    handler = logging.FileHandler(PROFILE_LOG) if PROFILE_LOG else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def current_rerun():
+    return getattr(_local, "rerun", None)
+
+
+def start_rerun(label="dashboard"):
+    if not PROFILE:
+        return None
+    _configure_logger()
+    _local.rerun = Rerun(label)
+    return _local.rerun
+
+
+def section(name):
+    if not PROFILE:
+        return
+    rerun = current_rerun()
+    if rerun is not None:
+        rerun.begin_section(name)
+
+
+def finish_rerun():
+    rerun = current_rerun()
+    if not PROFILE or rerun is None:
+        return None
+    rerun.begin_section(None)
+    for entry in rerun.records:
+        logger.info(json.dumps(entry))
+    logger.info(json.dumps({"rerun": rerun.id, "kind": "rerun", "name": rerun.label, "wall_ms": rerun.total_ms(),
+                            "records": len(rerun.records), "milestones": rerun.milestones}))
+    _local.rerun = None
+    return rerun
+
+
+def record(name, kind, wall_s, rows=None, cache=None):
+    if not PROFILE:
+        return
+    rerun = current_rerun()
+    if rerun is not None:
+        rerun.add(name, kind, wall_s, rows, cache)
+
+
+def milestone(name):
+    if not PROFILE:
+        return
+    rerun = current_rerun()
+    if rerun is not None:
+        rerun.reach(name)
+
+
+def bind(func):
+    # Loader threads have no rerun of their own; records of the bound call go to the submitting rerun
+    rerun = current_rerun()
+    if not PROFILE or rerun is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = current_rerun()
+        _local.rerun = rerun
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.rerun = previous
+    return wrapper
+
+
+def _count_rows(args, kwargs, result):
+    # Rows returned by loaders and transforms, rows consumed by figure builders
+    if hasattr(result, "shape") and hasattr(result, "columns"):
+        return len(result)
+    rows = [len(a) for a in list(args) + list(kwargs.values()) if hasattr(a, "shape") and hasattr(a, "columns")]
+    return sum(rows) if rows else None
+
+
+def timed(kind):
+    def decorate(func):
+        if not PROFILE:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            record(func.__qualname__, kind, time.perf_counter() - start, _count_rows(args, kwargs, result))
+            return result
+        return wrapper
+    return decorate
+
+
+def track_cache(cached, inner_name, kind="cache"):
+    # A call is a miss when the wrapped function ran, i.e. recorded itself under inner_name
+    if not PROFILE:
+        return cached
+
+    @functools.wraps(cached)
+    def wrapper(*args, **kwargs):
+        rerun = current_rerun()
+        before = len(rerun.records) if rerun is not None else 0
+        start = time.perf_counter()
+        result = cached(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if rerun is not None:
+            ran = any(r["name"] == inner_name for r in rerun.records[before:])
+            rerun.add(inner_name, kind, elapsed, cache="miss" if ran else "hit")
+        return result
+    return wrapper
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from mappings import ptx_carriers, dashboard_years, corresponding_cat
+from instrument import timed
+
+'''
+Batch KPI engine for the dashboard's key numbers.
+
+kpi_table computes, for every country of a demand panel (see panel.py) and every (sector, start year,
+end year) period, in one vectorized pass per period:
+- the demand in both years, the total change and the average annual growth (CAGR) in percent,
+- the share of the country in the EU27 demand and, for the PtX outputs, the demand and market share of
+  the green fuels (mappings.ptx_carriers) in the end year,
+- the most demanding category in both years.
+
+Missing and zero values are explicit: a KPI that cannot be computed is NaN (None for categories), and the
+Status column says why: "missing" when the country has no data in one of the years, "no period" when
+the start and end year are the same (no annual growth), "no start demand" when the start demand is zero.
+Countries without any data for a sector get no rows.
+
+The dashboard header reads its numbers from the table, and the same table feeds the all-countries view.
+
+Functions included:
+- kpi_table: KPI rows per (sector, country, period) for every country of a panel.
+- kpi_row: The KPIs of one country and period, as a dict.
+- format_kpi: Formats a KPI value, with a placeholder when it is missing.
+- category_label: Display name of a top category, with a placeholder when it is missing.
+- kpi_view: The table with readable column names and category labels, for display.
+'''
+
+REFERENCE_COUNTRY = "EU27"
+
+# Periods of the key numbers: transport from 2025 and industry from 2030 to 2050, PtX up to each dashboard year
+KEY_PERIODS = [("Transport", 2025, 2050), ("Industry", 2030, 2050)]
+PTX_PERIODS = [("PtX", dashboard_years[0], year) for year in dashboard_years]
+
+# Sectors whose fuel axis holds the green fuels
+PTX_SHARE_SECTORS = ["PtX"]
+
+KPI_COLUMNS = ["Sector", "Country", "Start", "End", "StartDemand", "EndDemand", "Change", "CAGR", "ShareEU27",
+               "PtXDemand", "PtXShare", "TopCategoryStart", "TopCategoryEnd", "Status"]
+
+VIEW_COLUMNS = {"Country": "Country", "Start": "From", "End": "To", "StartDemand": "Demand from (EJ)",
+                "EndDemand": "Demand to (EJ)", "Change": "Change (%)", "CAGR": "Annual growth (%)",
+                "ShareEU27": "Share of EU27 (%)", "PtXDemand": "Green fuels (EJ)", "PtXShare": "Green fuels share (%)",
+                "TopCategoryStart": "Top category from", "TopCategoryEnd": "Top category to", "Status": "Status"}
+
+
+def _period_kpis(panel, sector, start, end):
+    first = panel.totals(sector, start).to_numpy()
+    last = panel.totals(sector, end).to_numpy()
+    growth = panel.growth(sector, start, end)
+
+    countries = panel.countries
+    reference = last[countries.index(REFERENCE_COUNTRY)] if REFERENCE_COUNTRY in countries else np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share_eu27 = np.where(reference > 0, last / reference * 100, np.nan)
+
+    if sector in PTX_SHARE_SECTORS:
+        ptx_demand = panel.totals(sector, end, fuels=ptx_carriers).to_numpy()
+        ptx_share = panel.shares(sector, end, fuels=ptx_carriers).to_numpy()
+    else:
+        ptx_demand = ptx_share = np.full(len(countries), np.nan)
+
+    status = np.select([np.isnan(first) | np.isnan(last), np.full(len(countries), start == end), first <= 0],
+                       ["missing", "no period", "no start demand"], "ok")
+    table = pd.DataFrame({
+        "Sector": sector, "Country": countries, "Start": start, "End": end,
+        "StartDemand": first, "EndDemand": last,
+        "Change": growth["Change"].to_numpy(), "CAGR": growth["AnnualGrowth"].to_numpy(),
+        "ShareEU27": share_eu27, "PtXDemand": ptx_demand, "PtXShare": ptx_share,
+        "TopCategoryStart": panel.top_category(sector, start).to_numpy(),
+        "TopCategoryEnd": panel.top_category(sector, end).to_numpy(),
+        "Status": status
+    })
+    return table[panel.present[sector].any(axis=1)]
+
+
+@timed("transform")
+def kpi_table(panel, periods):
+    # periods: (sector, start year, end year); sectors missing from the panel are skipped
+    parts = [_period_kpis(panel, sector, start, end) for sector, start, end in periods if sector in panel.values]
+    if not parts:
+        return pd.DataFrame(columns=KPI_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def kpi_row(table, sector, country, end=None):
+    # First period of the sector ending in end (any period when end is None); all KPIs missing when absent
+    rows = table[(table["Sector"] == sector) & (table["Country"] == country)]
+    if end is not None:
+        rows = rows[rows["End"] == end]
+    if rows.empty:
+        row = {col: np.nan for col in KPI_COLUMNS}
+        row.update({"Sector": sector, "Country": country, "TopCategoryStart": None, "TopCategoryEnd": None,
+                    "Status": "missing"})
+        return row
+    return rows.iloc[0].to_dict()
+
+
+def format_kpi(value, spec, suffix="", missing="n/a"):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return missing
+    return f"{value:{spec}}{suffix}"
+
+
+def category_label(key, missing="n/a"):
+    return corresponding_cat(key) if key is not None else missing
+
+
+def kpi_view(table):
+    view = table.drop(columns="Sector").copy()
+    for col in ["TopCategoryStart", "TopCategoryEnd"]:
+        view[col] = view[col].map(lambda key: category_label(key, None))
+    # Columns without any value for these sectors (e.g. green fuels outside PtX) are left out
+    view = view[[col for col in VIEW_COLUMNS if view[col].notna().any() or col == "Status"]]
+    return view.rename(columns=VIEW_COLUMNS)
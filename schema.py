@@ -0,0 +1,69 @@
+import os
+import pandas as pd
+
+from mappings import iso_to_country, categories, transport_fuel_paths, fuel_order_full
+from mappings import industry_categories, industry_materials, ptx_sectors
+
+'''
+Opt-in compact schema for the long-format fact tables.
+
+Label columns become pandas Categoricals over the fixed label sets from mappings.py (values outside those
+sets are appended, never dropped), Year becomes int16 and Value float32. Filters such as
+df['Country'] == selected_country then compare integer codes instead of Python strings, and each
+frame takes a fraction of its original memory.
+
+Enable it for the dashboard with PTX_COMPACT_SCHEMA=1.
+
+Functions included:
+- compact_frame: Converts a long-format frame to the compact schema.
+- frame_memory: Deep memory usage of a frame in bytes.
+- memory_report: Before/after memory table for a set of frames.
+'''
+
+COMPACT_SCHEMA = os.environ.get("PTX_COMPACT_SCHEMA", "0") == "1"
+
+country_codes = list(iso_to_country) + ["EU27"]
+
+TRANSPORT_SCHEMA = {"Country": country_codes, "Category": categories + transport_fuel_paths}
+INDUSTRY_SCHEMA = {"Country": country_codes, "Category": industry_categories, "Material": industry_materials}
+OUTPUTS_SCHEMA = {"Country": country_codes, "FuelGroup": fuel_order_full, "Sector": ptx_sectors}
+
+
+def compact_frame(df, schema):
+    df = df.copy()
+    for col, fixed in schema.items():
+        if col not in df.columns:
+            continue
+        known = set(fixed)
+        extras = sorted(v for v in df[col].dropna().unique() if v not in known)
+        df[col] = pd.Categorical(df[col], categories=list(fixed) + extras)
+
+    if "Year" in df.columns:
+        df["Year"] = df["Year"].astype("int16")
+    if "Value" in df.columns:
+        df["Value"] = df["Value"].astype("float32")
+    return df
+
+
+def frame_memory(df):
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except ValueError:
+        # Read-only object columns (dataset.freeze) are measured on a writable copy of their pointers
+        columns = sum(df.iloc[:, i].copy().memory_usage(index=False, deep=True) for i in range(df.shape[1]))
+        return int(columns + df.index.memory_usage(deep=True))
+
+
+def memory_report(frames, schemas):
+    rows = []
+    for name, df in frames.items():
+        before = frame_memory(df)
+        after = frame_memory(compact_frame(df, schemas[name]))
+        rows.append({
+            "Table": name,
+            "Rows": len(df),
+            "Before (MB)": before / 1e6,
+            "After (MB)": after / 1e6,
+            "Reduction": before / after if after else float("nan")
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules live at the repository root; the parse cache stays off so tests never share parsed files
+os.environ["PTX_CACHE_DIR"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from mappings import ptx_carriers, fossil_carriers, focus_options
+from aggregations import apply_focus_filter
+
+
+def pandas_focus_filter(df, focus):
+    # The row-wise version that apply_focus_filter replaced
+    df = df.copy()
+    if focus == "Green fuels only":
+        return df[df["FuelGroup"].isin(ptx_carriers)]
+    if focus == "Hydrogen vs other Green fuels":
+        d = df[df["FuelGroup"].isin(ptx_carriers)].copy()
+        d["FuelGroup"] = d["FuelGroup"].apply(lambda x: "Hydrogen" if x == "Hydrogen" else "Other Green fuels")
+        return d
+    if focus == "Green fuels vs Fossil fuels":
+        d = df[df["FuelGroup"].isin(ptx_carriers + fossil_carriers)].copy()
+        d["FuelGroup"] = d["FuelGroup"].apply(lambda x: "Green fuels" if x in ptx_carriers else "Fossil fuels")
+        return d
+    return df
+
+
+def make_outputs():
+    fuels = ["Hydrogen", "Ammonia", fossil_carriers[0], "Electricity", "Synthetic Liquids", None]
+    return pd.DataFrame({"Country": "DE", "Year": 2050, "Sector": "Aviation", "FuelGroup": fuels,
+                         "Value": [float(i) for i in range(len(fuels))]}, index=range(10, 10 + len(fuels)))
+
+
+@pytest.mark.parametrize("focus", focus_options)
+@pytest.mark.parametrize("categorical", [False, True])
+def test_focus_filter_matches_the_pandas_version(focus, categorical):
+    df = make_outputs()
+    if categorical:
+        df["FuelGroup"] = df["FuelGroup"].astype("category")
+    result = apply_focus_filter(df, focus)
+    expected = pandas_focus_filter(df, focus)
+
+    assert result.index.tolist() == expected.index.tolist()
+    pd.testing.assert_series_equal(result["FuelGroup"].astype(object), expected["FuelGroup"].astype(object))
+    pd.testing.assert_frame_equal(result.drop(columns="FuelGroup"), expected.drop(columns="FuelGroup"))
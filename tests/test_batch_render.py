@@ -0,0 +1,27 @@
+import pandas as pd
+
+from cube import DemandCube
+from panel import DemandPanel
+from batch_render import figure_tasks
+
+
+def make_context():
+    # DE has 2050 data, FR stops in 2030
+    transport = pd.DataFrame({"Country": ["DE", "DE", "FR"], "Year": [2030, 2050, 2030],
+                              "Category": ["Road", "Rail", "Road"], "Value": [1.0, 2.0, 3.0]})
+    industry = pd.DataFrame({"Country": ["DE", "FR"], "Year": [2050, 2030], "Category": ["Steel", "Steel"],
+                             "Material": ["Coal", "Coal"], "Value": [1.0, 1.0]})
+    cube = DemandCube.from_frames(transport, industry, pd.DataFrame())
+    return {"cube": cube, "panel": DemandPanel.from_cube(cube)}
+
+
+def test_no_map_task_without_2050_data():
+    paths = [path for path, _ in figure_tasks(make_context(), ["DE", "FR"], [2030], [])]
+    assert "FR/transport_stack" in paths and "FR/industry_bar" in paths
+    assert [path for path in paths if "_map_" in path] == ["europe/industry_map_steel", "europe/transport_map_rail"]
+
+
+def test_map_tasks_use_the_category_key():
+    tasks = dict(figure_tasks(make_context(), ["DE"], [2030], []))
+    assert tasks["europe/transport_map_rail"] == ("transport_map", ("Rail",))
+    assert tasks["europe/industry_map_steel"] == ("industry_map", ("Steel",))
@@ -0,0 +1,36 @@
+import os
+import pandas as pd
+
+from cache import read_cached, cache_path
+
+
+def test_unwritable_frame_is_returned_without_caching(tmp_path):
+    source = tmp_path / "workbook.csv"
+    source.write_text("Value\n1\n")
+    cache_dir = str(tmp_path / "cache")
+    reads = []
+
+    def reader(file_path):
+        # Mixed strings and floats in an object column: Arrow raises ArrowTypeError (a TypeError)
+        reads.append(file_path)
+        return pd.DataFrame({"Value": ["n/a", 1.5]}, dtype=object)
+
+    assert read_cached(str(source), reader, cache_dir)["Value"].tolist() == ["n/a", 1.5]
+    assert not os.path.exists(cache_path(str(source), reader, cache_dir))
+    read_cached(str(source), reader, cache_dir)
+    assert len(reads) == 2
+
+
+def test_unreadable_entry_is_parsed_again(tmp_path):
+    source = tmp_path / "workbook.csv"
+    source.write_text("Value\n1\n")
+    cache_dir = str(tmp_path / "cache")
+
+    def reader(file_path):
+        return pd.read_csv(file_path)
+
+    read_cached(str(source), reader, cache_dir)
+    target = cache_path(str(source), reader, cache_dir)
+    with open(target, "wb") as f:
+        f.write(b"not parquet")
+    assert read_cached(str(source), reader, cache_dir)["Value"].tolist() == [1]
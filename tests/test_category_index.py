@@ -0,0 +1,33 @@
+import pandas as pd
+
+from category_index import CategoryTrie
+
+PREFIXES = ["FE|Transport|Pass", "FE|Transport|Pass|Rail", "FE|Transport|Freight|Road"]
+
+
+def longest_prefix(value):
+    # The per-row split the trie replaces: longest prefix that ends on a segment boundary
+    matches = [p for p in PREFIXES if value == p or value.startswith(p + "|")]
+    if not matches:
+        return None, value
+    match = max(matches, key=len)
+    return match, value[len(match) + 1:]
+
+
+def test_split_matches_the_longest_whole_segment_prefix():
+    trie = CategoryTrie(PREFIXES)
+    values = ["FE|Transport|Pass|Rail|Liquids|Biomass", "FE|Transport|Pass|Road|Electricity", "FE|Transport|Pass",
+              "FE|Transport|Passenger|Rail", "FE|Transport|Freight|Road|Hydrogen", "FE|Buildings|Gases"]
+    for value in values:
+        assert trie.split(value) == longest_prefix(value)
+
+
+def test_split_column_handles_repeats_and_missing_values():
+    trie = CategoryTrie(PREFIXES)
+    values = pd.Series(["FE|Transport|Pass|Rail|Liquids", None, "FE|Transport|Pass|Rail|Liquids", "Other"],
+                       index=[10, 11, 12, 13])
+    split = trie.split_column(values)
+
+    assert split.index.tolist() == [10, 11, 12, 13]
+    assert split["MainCategory"].tolist() == ["FE|Transport|Pass|Rail", None, "FE|Transport|Pass|Rail", None]
+    assert split["Fuel"].tolist() == ["Liquids", None, "Liquids", "Other"]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from cube import DemandCube
+from aggregations import get_country_demand
+
+
+def make_frames():
+    transport = pd.DataFrame({"Country": ["DE", "DE", "DE", "FR", "FR"], "Year": [2030, 2030, 2050, 2030, 2050],
+                              "Category": ["Road", "Road", "Rail", "Road", "Road"], "Value": [1.0, 0.5, 2.0, 3.0, 4.0]})
+    industry = pd.DataFrame({"Country": ["DE", "DE", "FR"], "Year": [2030, 2050, 2050],
+                             "Category": ["Steel", "Steel", "Cement"], "Material": ["Coal", "Hydrogen", "Gas"],
+                             "Value": [1.0, 2.0, 3.0]})
+    outputs = pd.DataFrame({"Country": ["DE", "DE"], "Year": [2050, 2050], "Sector": ["Aviation", "Shipping"],
+                            "FuelGroup": ["Hydrogen", "Ammonia"], "Value": [0.25, np.nan]})
+    return transport, industry, outputs
+
+
+def test_totals_match_the_source_frames():
+    transport, industry, outputs = make_frames()
+    cube = DemandCube.from_frames(transport, industry, outputs)
+
+    assert cube.total("Transport", "DE", 2030) == transport[(transport["Country"] == "DE") & (transport["Year"] == 2030)]["Value"].sum()
+    assert cube.total("Industry", ["DE", "FR"], 2050, fuel="Hydrogen") == 2.0
+    assert cube.total("PtX", "DE") == 0.25
+    # Unknown labels and combinations select nothing
+    assert cube.total("Transport", "PL") == 0.0
+    assert cube.total("Transport", "FR", category="Rail") == 0.0
+
+
+def test_rollup_matches_groupby():
+    transport, industry, outputs = make_frames()
+    cube = DemandCube.from_frames(transport, industry, outputs)
+
+    expected = transport.groupby(["Country", "Year"], as_index=False)["Value"].sum()
+    pd.testing.assert_frame_equal(cube.rollup("Transport", ["Country", "Year"]), expected, check_dtype=False)
+    assert cube.rollup("Transport", ["Year"], country="PL").empty
+
+
+def test_country_demand_matches_the_frame_version():
+    transport, industry, outputs = make_frames()
+    cube = DemandCube.from_frames(transport, industry, outputs)
+
+    rows, grouped = cube.country_demand("Industry", "DE")
+    expected_rows, expected_grouped = get_country_demand(industry, "DE", "Industry")
+    pd.testing.assert_frame_equal(grouped, expected_grouped, check_dtype=False)
+    assert rows["Value"].sum() == expected_rows["Value"].sum()
+    assert set(rows.columns) == {"Country", "Year", "Category", "Material", "Value"}
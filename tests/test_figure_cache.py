@@ -0,0 +1,48 @@
+import json
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import figure_cache
+from figure_cache import FigureCache, figure_size
+
+
+def spec(n):
+    # A figure dict whose JSON is a little over n bytes
+    return {"data": [{"type": "bar", "name": "x" * n}]}
+
+
+def test_size_estimate_is_close_to_the_json():
+    fig = go.Figure(go.Bar(x=["DE", "FR", "IT"], y=np.array([1.5, 2.25, 3.0])), layout={"title": "Demand"})
+    sent = len(pio.to_json(fig, validate=False))
+    assert abs(figure_size(fig) - sent) < 0.1 * sent
+    assert abs(figure_size(spec(100)) - len(json.dumps(spec(100)))) < 20
+
+
+def test_least_recently_used_figures_are_evicted():
+    cache = FigureCache(max_bytes=450)
+    for key in ["a", "b", "c"]:
+        cache.get((key,), lambda: spec(100))
+    cache.get(("a",), lambda: spec(100))
+    cache.get(("d",), lambda: spec(100))
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.bytes <= 450
+    builds = []
+    cache.get(("b",), lambda: builds.append("b") or spec(100))
+    cache.get(("a",), lambda: builds.append("a") or spec(100))
+    assert builds == ["b"]
+
+
+def test_figures_larger_than_the_cache_are_not_kept():
+    cache = FigureCache(max_bytes=50)
+    cache.get(("a",), lambda: spec(100))
+    assert cache.stats()["entries"] == 0 and cache.bytes == 0
+
+
+def test_disabled_cache_does_not_size_figures(monkeypatch):
+    sized = []
+    monkeypatch.setattr(figure_cache, "figure_size", lambda fig: sized.append(fig) or 0)
+    cache = FigureCache(max_bytes=0)
+    assert cache.get(("a",), lambda: spec(10)) == spec(10)
+    assert sized == [] and cache.stats()["misses"] == 1
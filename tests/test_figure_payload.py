@@ -0,0 +1,41 @@
+import base64
+import numpy as np
+
+from figure_payload import compact_figure_dict, round_values, CHART_DIGITS
+
+
+def decode(array):
+    return np.frombuffer(base64.b64decode(array["bdata"]), dtype=array["dtype"])
+
+
+def test_values_are_rounded_to_the_hover_decimals():
+    trace = {"type": "bar", "x": ["DE", "FR"], "y": [1.23456, 2.5], "hovertemplate": "%{y:.2f} EJ", "xaxis": "x"}
+    compact = compact_figure_dict({"data": [trace], "layout": {}})["data"][0]
+    assert compact["y"] == [1.23, 2.5]
+    # Default subplot references are dropped, the rest of the trace is kept
+    assert "xaxis" not in compact and compact["x"] == ["DE", "FR"] and compact["hovertemplate"] == trace["hovertemplate"]
+
+
+def test_small_values_keep_significant_digits():
+    values = np.array([0.0012345, 0.0004321])
+    rounded, decimals = round_values(values, decimals=3)
+    # The largest value keeps CHART_DIGITS significant digits instead of reading 0.001
+    assert decimals == CHART_DIGITS + 2
+    np.testing.assert_array_equal(rounded, np.round(values, decimals))
+
+    rounded, _ = round_values(np.array([123456.789, 0.000123456789, 0.0]), digits=4)
+    np.testing.assert_allclose(rounded, [123500.0, 0.0001235, 0.0])
+
+
+def test_long_arrays_are_sent_as_typed_arrays():
+    y = np.linspace(0, 1, 50) ** 2
+    compact = compact_figure_dict({"data": [{"type": "scatter", "y": y.tolist()}], "layout": {}})["data"][0]
+    assert compact["y"]["dtype"] == "f4"
+    np.testing.assert_allclose(decode(compact["y"]), round_values(y)[0], rtol=1e-6)
+
+
+def test_template_keeps_the_used_trace_types():
+    layout = {"template": {"data": {"bar": [{}], "scatter": [{}], "pie": [{}]}, "layout": {"font": {}}}}
+    compact = compact_figure_dict({"data": [{"type": "bar", "y": [1]}], "layout": layout})
+    assert list(compact["layout"]["template"]["data"]) == ["bar"]
+    assert compact["layout"]["template"]["layout"] == {"font": {}}
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from geo import alpha3_codes, country_table, resolve_codes
+
+
+def test_eurostat_codes_and_aggregates():
+    codes = pd.Series(["DE", "EL", "EU27", "NO"], index=[5, 6, 7, 8])
+    alpha3 = alpha3_codes(codes)
+    assert alpha3.tolist() == ["DEU", "GRC", None, "NOR"]
+    assert alpha3.index.tolist() == [5, 6, 7, 8]
+
+
+def test_categorical_codes_map_like_strings():
+    codes = pd.Series(pd.Categorical(["FR", "EL", "FR"]))
+    assert alpha3_codes(codes).tolist() == ["FRA", "GRC", "FRA"]
+
+
+def test_resolved_codes_cover_the_table():
+    table = country_table()
+    lookup = resolve_codes(["CH"])
+    assert lookup["CH"] == "CHE"
+    assert all(lookup[code] == alpha3 for code, alpha3 in table["Alpha3"].items())
+    assert table.loc["EL", "Alpha2"] == "GR" and table.loc["EU27", "Aggregate"]
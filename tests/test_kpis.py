@@ -0,0 +1,40 @@
+import numpy as np
+
+from panel import DemandPanel
+from kpis import kpi_table, kpi_row
+
+
+def make_panel():
+    # DE: demand in both years, FR: no 2050 data, IT: no demand in 2025
+    countries = ["DE", "FR", "IT"]
+    values = np.array([[1.0, 4.0], [2.0, 0.0], [0.0, 3.0]]).reshape(3, 2, 1, 1)
+    present = np.array([[True, True], [True, False], [True, True]])
+    return DemandPanel(countries, {"Transport": [2025, 2050]}, {"Transport": (["Road"], [""])},
+                       {"Transport": values}, {"Transport": present})
+
+
+def test_status_of_missing_and_zero_rows():
+    table = kpi_table(make_panel(), [("Transport", 2025, 2050), ("Transport", 2050, 2050)])
+
+    de = kpi_row(table, "Transport", "DE", end=2050)
+    assert de["Status"] == "ok"
+    assert de["Change"] == 300.0
+    assert np.isclose(de["CAGR"], (4 ** (1 / 25) - 1) * 100)
+
+    fr = kpi_row(table, "Transport", "FR", end=2050)
+    assert fr["Status"] == "missing"
+    assert np.isnan(fr["EndDemand"]) and np.isnan(fr["CAGR"])
+
+    it = kpi_row(table, "Transport", "IT", end=2050)
+    assert it["Status"] == "no start demand"
+    assert np.isnan(it["Change"]) and np.isnan(it["CAGR"])
+
+    same_year = table[(table["Start"] == 2050) & (table["Country"] == "DE")].iloc[0]
+    assert same_year["Status"] == "no period"
+    assert same_year["Change"] == 0.0
+    assert np.isnan(same_year["CAGR"])
+
+
+def test_country_without_data_is_missing():
+    table = kpi_table(make_panel(), [("Transport", 2025, 2050)])
+    assert kpi_row(table, "Transport", "PL")["Status"] == "missing"
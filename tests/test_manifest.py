@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+import pytest
+
+from manifest import IncrementalTable
+
+
+def list_csv(folder):
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".csv")]
+
+
+def test_reader_fails_once_then_succeeds(tmp_path):
+    for name, value in [("a.csv", 1.0), ("b.csv", 2.0)]:
+        pd.DataFrame({"Value": [value]}).to_csv(tmp_path / name, index=False)
+
+    calls = {"failed": False}
+
+    def flaky_reader(file_path):
+        # e.g. a workbook that is still being written on the first refresh
+        if not calls["failed"]:
+            calls["failed"] = True
+            raise ValueError("half-written file")
+        return pd.read_csv(file_path)
+
+    table = IncrementalTable(str(tmp_path), list_csv, flaky_reader)
+    with pytest.raises(ValueError):
+        table.refresh(workers=1)
+    assert table.manifest.entries == {}
+
+    data, version = table.versioned_refresh(workers=1)
+    assert data["Value"].tolist() == [1.0, 2.0]
+    assert version == 1
+    assert sorted(table.manifest.entries) == list_csv(str(tmp_path))
+
+
+def test_unchanged_files_are_not_read_again(tmp_path):
+    pd.DataFrame({"Value": [1.0]}).to_csv(tmp_path / "a.csv", index=False)
+    reads = []
+
+    def reader(file_path):
+        reads.append(file_path)
+        return pd.read_csv(file_path)
+
+    table = IncrementalTable(str(tmp_path), list_csv, reader)
+    table.refresh(workers=1)
+    _, version = table.versioned_refresh(workers=1)
+    assert len(reads) == 1
+    assert version == 1
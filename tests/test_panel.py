@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import DemandCube
+from panel import DemandPanel
+
+
+def make_cube(scale=1.0):
+    transport = pd.DataFrame({"Country": ["DE", "DE", "FR"], "Year": [2030, 2050, 2030],
+                              "Category": ["Road", "Rail", "Road"], "Value": [1.0, 2.0, 3.0]})
+    transport["Value"] *= scale
+    industry = pd.DataFrame({"Country": ["DE"], "Year": [2050], "Category": ["Steel"], "Material": ["Coal"], "Value": [4.0]})
+    return DemandCube.from_frames(transport, industry, pd.DataFrame())
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    panel = DemandPanel.from_cube(make_cube())
+    path = panel.save(str(tmp_path / "panel.npy"), source="a")
+    loaded = DemandPanel.load(path, source="a")
+
+    assert isinstance(loaded.values["Transport"], np.memmap)
+    assert loaded.countries == panel.countries and loaded.labels == panel.labels
+    for sector in panel.values:
+        np.testing.assert_array_equal(loaded.values[sector], panel.values[sector])
+        np.testing.assert_array_equal(loaded.present[sector], panel.present[sector])
+    with pytest.raises(ValueError):
+        DemandPanel.load(path, source="b")
+
+
+def test_arrays_and_axes_of_two_saves_are_not_paired(tmp_path):
+    path = str(tmp_path / "panel.npy")
+    other = str(tmp_path / "other.npy")
+    DemandPanel.from_cube(make_cube()).save(path, source="a")
+    DemandPanel.from_cube(make_cube(10)).save(other, source="a")
+    # The new arrays next to the old axes, as between the two replaces of a save
+    os.replace(other, path)
+    with pytest.raises(ValueError):
+        DemandPanel.load(path, source="a")
+
+
+def test_metrics_match_the_cube():
+    cube = make_cube()
+    panel = DemandPanel.from_cube(cube)
+
+    expected = cube.rollup("Transport", ["Country", "Year"]).set_index(["Country", "Year"])["Value"].unstack("Year")
+    pd.testing.assert_frame_equal(panel.series("Transport"), expected, check_names=False, check_column_type=False)
+    assert panel.totals("Transport", 2030).loc["FR"] == cube.total("Transport", "FR", 2030)
+    assert panel.totals("Industry", 2050, fuels="Coal").loc["DE"] == cube.total("Industry", "DE", 2050, fuel="Coal")
+    # FR has no 2050 data: NaN, not 0
+    assert np.isnan(panel.totals("Transport", 2050).loc["FR"])
+
+
+def test_growth_matches_calculate_growth():
+    from aggregations import calculate_growth
+
+    panel = DemandPanel.from_cube(make_cube())
+    growth = panel.growth("Transport", 2030, 2050).loc["DE"]
+    change, annual = calculate_growth(1.0, 2030, 2.0, 2050)
+    assert np.isclose(growth["Change"], change) and np.isclose(growth["AnnualGrowth"], annual)
+    assert panel.top_category("Transport", 2050).loc["DE"] == "Rail"
+    assert panel.top_category("Transport", 2050).loc["FR"] is None
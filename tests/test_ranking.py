@@ -0,0 +1,49 @@
+import pandas as pd
+
+from cube import DemandCube
+from panel import DemandPanel
+from ranking import RankingIndex
+from aggregations import aggregate_country_demand
+
+
+def make_frame():
+    # Seven countries plus EU27, with a tie between IT and PL
+    rows = []
+    for country, base in [("DE", 5.0), ("FR", 4.0), ("IT", 3.0), ("PL", 3.0), ("ES", 2.0), ("NL", 1.0), ("AT", 6.0),
+                          ("EU27", 100.0)]:
+        for year, factor in [(2030, 1.0), (2040, 2.0), (2050, 0.5 if country == "AT" else 3.0)]:
+            rows.append({"Country": country, "Year": year, "Category": "Road", "Value": base * factor})
+    return pd.DataFrame(rows)
+
+
+def test_top_series_matches_aggregate_country_demand():
+    df = make_frame()
+    index = RankingIndex.from_frames({"Transport": df})
+    filtered, top = index.top_series("Transport", 5)
+    expected, expected_top = aggregate_country_demand(df, "Transport")
+
+    assert top == expected_top
+    pd.testing.assert_frame_equal(filtered, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_window_totals_and_ranking():
+    df = make_frame()
+    index = RankingIndex.from_frames({"Transport": df})
+    window = df[(df["Year"] >= 2040) & (df["Country"] != "EU27")].groupby("Country")["Value"].sum()
+
+    pd.testing.assert_series_equal(index.totals("Transport", (2040, 2050)), window, check_names=False)
+    assert index.top("Transport", 2, (2040, 2050)) == window.sort_values(ascending=False, kind="stable").index[:2].tolist()
+    assert index.top("Transport", 3, (2030, 2030)) == ["AT", "DE", "FR"]
+    assert "EU27" not in index.ranking("Transport")
+
+
+def test_panel_index_matches_frame_index():
+    df = make_frame()
+    cube = DemandCube.from_frames(df, pd.DataFrame(), pd.DataFrame())
+    from_frames = RankingIndex.from_cube(cube, sectors=("Transport",))
+    from_panel = RankingIndex.from_panel(DemandPanel.from_cube(cube), sectors=("Transport",))
+
+    for years in [None, (2030, 2040), (2050, 2050)]:
+        assert from_panel.ranking("Transport", years) == from_frames.ranking("Transport", years)
+        pd.testing.assert_series_equal(from_panel.totals("Transport", years), from_frames.totals("Transport", years),
+                                       check_names=False)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from schema import compact_frame, OUTPUTS_SCHEMA, country_codes
+
+
+def make_outputs():
+    return pd.DataFrame({"Country": ["FR", "DE", "XX", "DE"], "Year": [2030, 2050, 2050, 2030],
+                         "Sector": ["Aviation", "Shipping", "Aviation", "Aviation"],
+                         "FuelGroup": ["Hydrogen", "Ammonia", "New fuel", None], "Value": [0.1, 0.25, 1e-9, 3.0]})
+
+
+def test_compact_frame_keeps_the_values():
+    df = make_outputs()
+    compact = compact_frame(df, OUTPUTS_SCHEMA)
+
+    for col in ["Country", "Sector", "FuelGroup"]:
+        # Missing labels come back as NaN from the categorical
+        assert compact[col].astype(object).where(compact[col].notna(), None).tolist() == df[col].tolist()
+    assert compact["Year"].dtype == np.int16 and compact["Year"].tolist() == df["Year"].tolist()
+    assert compact["Value"].dtype == np.float32
+    np.testing.assert_allclose(compact["Value"], df["Value"], rtol=1e-6)
+    # The input frame is not changed
+    assert df["Country"].dtype == object
+
+
+def test_labels_outside_the_schema_are_appended():
+    compact = compact_frame(make_outputs(), OUTPUTS_SCHEMA)
+    categories = compact["Country"].cat.categories.tolist()
+    assert categories[:len(country_codes)] == country_codes and categories[len(country_codes):] == ["XX"]
+    assert compact["FuelGroup"].cat.categories[-1] == "New fuel"
+
+
+def test_filters_and_groupby_match_the_object_frame():
+    df = make_outputs()
+    compact = compact_frame(df, OUTPUTS_SCHEMA)
+    assert compact[compact["Country"] == "DE"].index.tolist() == df[df["Country"] == "DE"].index.tolist()
+    expected = df.groupby("Country")["Value"].sum()
+    result = compact.groupby("Country", observed=True)["Value"].sum()
+    np.testing.assert_allclose(result.loc[expected.index], expected, rtol=1e-6)
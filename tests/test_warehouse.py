@@ -0,0 +1,63 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from cube import DemandCube
+from warehouse import compile_warehouse, open_warehouse, panel_path
+
+
+def make_cube(scale):
+    transport = pd.DataFrame({"Country": ["DE", "DE", "FR", "FR"], "Year": [2025, 2050, 2025, 2050],
+                              "Category": ["Road", "Road", "Road", "Road"], "Value": [1.0, 2.0, 3.0, 4.0]})
+    transport["Value"] *= scale
+    return DemandCube.from_frames(transport, pd.DataFrame(), pd.DataFrame())
+
+
+def test_recompile_does_not_mix_file_versions(tmp_path):
+    path = str(tmp_path / "Default.sqlite")
+    compile_warehouse(make_cube(1), ["DE", "FR"], path, data_version=1)
+    warehouse = open_warehouse(path)
+
+    compile_warehouse(make_cube(10), ["DE", "FR"], path, data_version=2)
+    # The thread that opened the warehouse keeps reading its file; a thread that connects after the recompile
+    # would read the new one, and is refused
+    assert warehouse.cube.total("Transport", "DE", 2050) == 2.0
+    errors = []
+
+    def query():
+        try:
+            warehouse.cube.total("Transport", "DE", 2050)
+        except ValueError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=query)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1
+
+    reopened = open_warehouse(path)
+    assert reopened is not warehouse
+    assert reopened.cube.total("Transport", "DE", 2050) == 20.0
+
+
+def test_sessions_query_in_parallel(tmp_path):
+    path = str(tmp_path / "Default.sqlite")
+    compile_warehouse(make_cube(1), ["DE", "FR"], path)
+    warehouse = open_warehouse(path)
+    with ThreadPoolExecutor(8) as pool:
+        totals = list(pool.map(lambda country: warehouse.cube.total("Transport", country, 2050), ["DE", "FR"] * 50))
+    assert totals == [2.0, 4.0] * 50
+
+
+def test_panel_of_another_compile_is_not_used(tmp_path):
+    path = str(tmp_path / "Default.sqlite")
+    other = str(tmp_path / "Other.sqlite")
+    compile_warehouse(make_cube(1), ["DE", "FR"], path)
+    compile_warehouse(make_cube(10), ["DE", "FR"], other)
+    # The panel of a newer compile next to the old file, as between the two replaces of a recompile
+    for suffix in ["", ".json"]:
+        os.replace(panel_path(other) + suffix, panel_path(path) + suffix)
+
+    warehouse = open_warehouse(path)
+    assert warehouse.panel.totals("Transport", 2050).loc["DE"] == 2.0
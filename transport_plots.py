@@ -1,18 +1,18 @@
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import streamlit as st
 import pandas as pd
 
-from process import convert_to_alpha3
+from geo import alpha3_codes
+from instrument import timed
+from map_templates import render_map
 from mappings import corresponding_cat
 from mappings import *
 
 
+@timed("figure")
 def plot_main_transport_stack(eu27_transport, colors):
     df = eu27_transport.copy()
     df['MainCategory'] = df['Category'].map(main_category_mapping)
-    main_grouped = df.groupby(['Year', 'MainCategory'])['Value'].sum().reset_index()
+    main_grouped = df.groupby(['Year', 'MainCategory'], observed=True)['Value'].sum().reset_index()
     pivot_main = main_grouped.pivot(index='Year', columns='MainCategory', values='Value').fillna(0)
 
     main_categories = ['Road', 'Aviation', 'Rail', 'Shipping']
@@ -31,41 +31,37 @@ def plot_main_transport_stack(eu27_transport, colors):
     return fig
 
 
-def plot_transport_pie_charts(eu27_transport, year):
+@timed("figure")
+def create_transport_pie_charts(eu27_transport, year):
     df = eu27_transport.copy()
     df['SubCategory'] = df['Category'].map(sub_category_mapping)
-    sub_data = df.groupby(['Year', 'SubCategory'])['Value'].sum().reset_index()
+    sub_data = df.groupby(['Year', 'SubCategory'], observed=True)['Value'].sum().reset_index()
     year_data = sub_data[sub_data['Year'] == year]
     
     passenger = year_data[year_data['SubCategory'].str.contains('Passenger')]
     freight = year_data[year_data['SubCategory'].str.contains('Freight')]
 
-    col1, col2 = st.columns(2)
-
-    with col1:
-        pie_pass = px.pie(
-            passenger,
-            names='SubCategory',
-            values='Value',
-            title=f"Passenger Transport Breakdown ({year})",
-            color='SubCategory',
-            color_discrete_map=transport_sub_colors
-        )
-        st.plotly_chart(pie_pass)
-
-    with col2:
-        pie_freight = px.pie(
-            freight,
-            names='SubCategory',
-            values='Value',
-            title=f"Freight Transport Breakdown ({year})",
-            color='SubCategory',
-            color_discrete_map=transport_sub_colors
-        )
-        st.plotly_chart(pie_freight)
-
-
-@st.cache_data
+    pie_pass = px.pie(
+        passenger,
+        names='SubCategory',
+        values='Value',
+        title=f"Passenger Transport Breakdown ({year})",
+        color='SubCategory',
+        color_discrete_map=transport_sub_colors
+    )
+
+    pie_freight = px.pie(
+        freight,
+        names='SubCategory',
+        values='Value',
+        title=f"Freight Transport Breakdown ({year})",
+        color='SubCategory',
+        color_discrete_map=transport_sub_colors
+    )
+    return pie_pass, pie_freight
+
+
+@timed("figure")
 def plot_transport_heatmap(transport_data, target_category):
     title_cat = corresponding_cat(target_category) 
     df = transport_data[
@@ -73,67 +69,19 @@ def plot_transport_heatmap(transport_data, target_category):
         (transport_data['Country'] != 'EU27')
     ].copy()
 
-    df['iso_alpha'] = df['Country'].apply(convert_to_alpha3)
+    df['iso_alpha'] = alpha3_codes(df['Country'])
     years = [2020, 2050]
     zmax = df['Value'].max()
 
-    fig = make_subplots(
-        rows=1, cols=2,
-        subplot_titles=[f"{year}" for year in years],
-        specs=[[{"type": "choropleth"}, {"type": "choropleth"}]],
-        horizontal_spacing=0.05
-    )
-
-    for i, year in enumerate(years):
+    panels = []
+    for year in years:
         year_df = df[df['Year'] == year]
         country_values = year_df.groupby('iso_alpha')['Value'].sum().reset_index()
+        panels.append({"locations": country_values['iso_alpha'], "z": country_values['Value'], "zmax": zmax})
 
-        choropleth = go.Choropleth(
-            locations=country_values['iso_alpha'],
-            z=country_values['Value'],
-            colorscale="RdBu_r",
-            zmin=0,
-            zmax=zmax,
-            colorbar=dict(
-                title="Demand (EJ)" if i == 1 else None,
-                titlefont=dict(size=18),
-                tickfont=dict(size=16),
-                len=0.45,
-                thickness=12,
-                x=0.999,
-                y=0.5
-            ),
-            showscale=(i == 1),
-            geo=f'geo{i+1}'
-        )
-
-        fig.add_trace(choropleth, row=1, col=i+1)
-
-    # Fix the legend for years 
-    for ann in fig.layout.annotations:
-        ann.y = 0.75
-        ann.font.size = 18
-
-    fig.update_layout(
-        title_text=f"{title_cat} demand in 2020 vs 2050",
-        title_font=dict(size=26, family="Arial", color="black"),
-        title_x=0.5,
-        title_y=0.75,
-        title_xanchor="center",
-        margin=dict(l=20, r=20, t=90, b=10),
-        height=1000,
-        width=1400,
-        geo=dict(
-            scope='europe', showland=True, landcolor="white",
-            lakecolor="lightblue", bgcolor='white',
-            lataxis_range=[35, 70], lonaxis_range=[-15, 35]
-        ),
-        geo2=dict(
-            scope='europe', showland=True, landcolor="white",
-            lakecolor="lightblue", bgcolor='white',
-            lataxis_range=[35, 70], lonaxis_range=[-15, 35]
-        )
-    )
+    # Data-only update of the shared two-panel map template
+    fig = render_map("categories", panels, titles=[f"{year}" for year in years],
+                     title_text=f"{title_cat} demand in 2020 vs 2050")
     return fig
 
 
@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+from cube import DemandCube, LEVELS
+from ranking import EXCLUDED_COUNTRIES
+from panel import DemandPanel
+from geo import resolve_codes
+from instrument import timed
+
+'''
+Embedded SQLite warehouse of a scenario, shared read-only by dashboard replicas.
+
+Each replica used to parse the REMIND export and every workbook on start, and keep its own frames. The
+warehouse compiles the demand cube of a scenario (the enriched transport, industry and PtX outputs, see
+cube.py) into one SQLite file, once per data drop:
+
+    python warehouse.py [--out DIR] [scenario ...]
+
+With PTX_WAREHOUSE_DIR set, the ScenarioStore serves every scenario that has a <name>.sqlite file in that
+folder from the file instead of the inputs. Replicas open it read-only, share the OS page cache, and
+start without parsing anything. The file is replaced atomically on recompile; replicas open the new file
+on their next rerun.
+
+Labels are stored as integer codes in the order of the cube's categorical levels, so results come back
+in the same order as from the in-memory cube. Aggregations run as SQL: KPI sums (total), country and
+year totals (rollup), and top-N countries (ranking). The dense panel of the scenario (see panel.py) is
+saved next to it as <name>.npy and memory-mapped by the replicas.
+
+Functions included:
+- compile_warehouse: Writes the demand cube and country list of a scenario to a SQLite file.
+- warehouse_path: The warehouse file of a scenario, when there is one.
+- panel_path: The panel file saved with a warehouse file.
+- open_warehouse: Opens a warehouse file read-only, once per file version.
+- Warehouse: Read-only warehouse with a cube, a ranking and the country list.
+- SqlCube: DemandCube interface answered by SQL queries.
+- SqlRanking: RankingIndex interface answered by SQL queries.
+'''
+
+WAREHOUSE_DIR = os.environ.get("PTX_WAREHOUSE_DIR", "")
+
+# Bump when the tables written by compile_warehouse change
+WAREHOUSE_VERSION = 2
+
+CODE_COLUMNS = {"Sector": "sector", "Country": "country", "Year": "year", "Category": "category", "Fuel": "fuel"}
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE labels (level TEXT, code INTEGER, label TEXT, PRIMARY KEY (level, code));
+CREATE TABLE countries (position INTEGER PRIMARY KEY, country TEXT);
+CREATE TABLE demand (sector INTEGER, country INTEGER, year INTEGER, category INTEGER, fuel INTEGER, value REAL);
+"""
+
+INDEX = "CREATE INDEX demand_lookup ON demand (sector, country, year, category, fuel)"
+
+_opened = {}
+_opened_lock = threading.Lock()
+
+
+@timed("loader")
+def compile_warehouse(cube, countries, path, data_version=None):
+    # cube: DemandCube of a loaded scenario, countries: its country selector list
+    values = cube.values
+    index = values.index
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        # compile_id pairs the file with the panel saved by the same compile
+        compile_id = uuid.uuid4().hex
+        meta = {"warehouse_version": WAREHOUSE_VERSION, "compiled": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "data_version": repr(data_version), "compile_id": compile_id}
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, json.dumps(v)) for k, v in meta.items()])
+
+        codes = []
+        for level in LEVELS:
+            level_values = index.get_level_values(level)
+            if level == "Year":
+                codes.append(level_values.to_numpy(dtype="int64"))
+                continue
+            categorical = pd.Categorical(level_values)
+            labels = [str(label) for label in categorical.categories]
+            conn.executemany("INSERT INTO labels VALUES (?, ?, ?)", [(level, code, label) for code, label in enumerate(labels)])
+            codes.append(categorical.codes.astype("int64"))
+
+        conn.executemany("INSERT INTO countries VALUES (?, ?)", list(enumerate(countries)))
+        # NaN cells are stored as NULL, which SUM skips like the cube does
+        rows = zip(*[c.tolist() for c in codes], [None if np.isnan(v) else v for v in values.to_numpy(dtype=float)])
+        conn.executemany("INSERT INTO demand VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.execute(INDEX)
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    # The panel goes first, so a replica that opens the new warehouse file usually finds its panel; one that
+    # pairs a file with the panel of another compile builds the panel from the file instead (see _load_panel).
+    # Replicas keep reading the old file until they reopen; they never see a partial one
+    DemandPanel.from_cube(cube).save(panel_path(path), source=compile_id)
+    os.replace(tmp_path, path)
+    return path
+
+
+def warehouse_path(scenario, warehouse_dir=WAREHOUSE_DIR):
+    if not warehouse_dir:
+        return None
+    path = os.path.join(warehouse_dir, f"{scenario.name}.sqlite")
+    return path if os.path.isfile(path) else None
+
+
+def panel_path(path):
+    return os.path.splitext(path)[0] + ".npy"
+
+
+def open_warehouse(path):
+    # One Warehouse per file version: a recompiled file has a new mtime and is opened again
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    with _opened_lock:
+        warehouse = _opened.get(path)
+        if warehouse is None or warehouse.stamp != stamp:
+            warehouse = Warehouse(path, stamp)
+            _opened[path] = warehouse
+        return warehouse
+
+
+class Warehouse:
+    def __init__(self, path, stamp=None):
+        self.path = path
+        self.stamp = stamp
+        self._local = threading.local()
+        self.meta = None
+
+        self.meta = {key: json.loads(value) for key, value in self.query("SELECT key, value FROM meta")}
+        if self.meta.get("warehouse_version") != WAREHOUSE_VERSION:
+            raise ValueError(f"{path} was compiled for warehouse version {self.meta.get('warehouse_version')}, "
+                             f"recompile it with python warehouse.py")
+        self.labels = {}
+        for level, code, label in self.query("SELECT level, code, label FROM labels ORDER BY level, code"):
+            self.labels.setdefault(level, []).append(label)
+        self._codes = {level: {label: code for code, label in enumerate(labels)} for level, labels in self.labels.items()}
+        self.countries = [country for country, in self.query("SELECT country FROM countries ORDER BY position")]
+        resolve_codes(self.labels.get("Country", []))
+        self.version = ("warehouse", path, stamp)
+        self.cube = SqlCube(self)
+        self.ranking = SqlRanking(self)
+        self.panel = self._load_panel()
+
+    def _load_panel(self):
+        # Memory-mapped when it was saved by the same compile as the file, otherwise built from the SQL cube
+        try:
+            return DemandPanel.load(panel_path(self.path), mmap_mode="r", source=self.meta["compile_id"])
+        except (OSError, ValueError):
+            return DemandPanel.from_cube(self.cube)
+
+    def connection(self):
+        # One read-only connection per thread, so sessions query in parallel; sqlite3 connections belong to the
+        # thread that made them, and Streamlit runs each session in its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro&immutable=1", uri=True)
+            # The path may hold a recompiled file by now, whose rows do not match the labels read from this one
+            compile_id = json.loads(conn.execute("SELECT value FROM meta WHERE key = 'compile_id'").fetchone()[0])
+            if self.meta is not None and compile_id != self.meta["compile_id"]:
+                conn.close()
+                raise ValueError(f"{self.path} was recompiled, open it again with open_warehouse")
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def codes(self, level, values):
+        # Codes of the requested labels; labels missing from the warehouse select nothing
+        if level == "Year":
+            return [int(v) for v in values]
+        lookup = self._codes.get(level, {})
+        return [lookup[v] for v in values if v in lookup]
+
+    def shares(self, arr):
+        # Query results are private to the session; the shared data lives in the page cache
+        return False
+
+    def nbytes(self):
+        return os.path.getsize(self.path) + self.panel.nbytes()
+
+
+def _where(warehouse, filters, alias=""):
+    # filters: level -> label, list of labels or None; returns None when a filter matches no label
+    clauses, params = [], []
+    for level, value in filters.items():
+        if value is None:
+            continue
+        values = [value] if isinstance(value, (str, int, np.integer)) else list(value)
+        codes = warehouse.codes(level, values)
+        if not codes:
+            return None
+        clauses.append(f"{alias}{CODE_COLUMNS[level]} IN ({','.join('?' * len(codes))})")
+        params += codes
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class SqlCube(DemandCube):
+    def __init__(self, warehouse):
+        # No values in memory: lookup, total and rollup query the warehouse
+        self.warehouse = warehouse
+        self.values = None
+
+    def _index(self, levels, columns):
+        arrays = []
+        for level, codes in zip(levels, columns):
+            if level == "Year":
+                arrays.append(np.asarray(codes, dtype="int64"))
+            else:
+                arrays.append(pd.Categorical.from_codes(np.asarray(codes, dtype="int64"), self.warehouse.labels.get(level, [])))
+        return pd.MultiIndex.from_arrays(arrays, names=levels)
+
+    def _select(self, levels, value, sector, country, year, category, fuel, group):
+        where = _where(self.warehouse, dict(zip(LEVELS, (sector, country, year, category, fuel))))
+        if where is None:
+            rows = []
+        else:
+            columns = ", ".join(CODE_COLUMNS[level] for level in levels)
+            sql = f"SELECT {columns}, {value} FROM demand{where[0]}"
+            if group:
+                sql += f" GROUP BY {columns}"
+            rows = self.warehouse.query(sql + f" ORDER BY {columns}", where[1])
+        columns = list(zip(*rows)) if rows else [[] for _ in range(len(levels) + 1)]
+        # NULL comes back as None, which float arrays read as NaN
+        return pd.Series(np.asarray(columns[-1], dtype=float), index=self._index(levels, columns[:-1]), name="Value")
+
+    def lookup(self, sector, country=None, year=None, category=None, fuel=None):
+        return self._select(LEVELS, "value", sector, country, year, category, fuel, group=False)
+
+    def total(self, sector, country=None, year=None, category=None, fuel=None):
+        where = _where(self.warehouse, dict(zip(LEVELS, (sector, country, year, category, fuel))))
+        if where is None:
+            return 0.0
+        # TOTAL is 0.0 for no rows or only NULLs, like the sum of an empty or all-NaN selection
+        return float(self.warehouse.query(f"SELECT TOTAL(value) FROM demand{where[0]}", where[1])[0][0])
+
+    def rollup(self, sector, by, country=None, year=None, category=None, fuel=None):
+        grouped = self._select(by, "TOTAL(value)", sector, country, year, category, fuel, group=True)
+        return self._to_frame(grouped, sector)
+
+
+class SqlRanking:
+    def __init__(self, warehouse):
+        self.warehouse = warehouse
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def _where(self, sector, years=None):
+        # Columns of the demand table, aliased d in every ranking query
+        where, params = _where(self.warehouse, {"Sector": sector}, "d.") or (" WHERE 0", [])
+        excluded = self.warehouse.codes("Country", EXCLUDED_COUNTRIES)
+        if excluded:
+            where += f" AND d.country NOT IN ({','.join('?' * len(excluded))})"
+            params += excluded
+        if years is not None:
+            where += " AND d.year BETWEEN ? AND ?"
+            params += [int(years[0]), int(years[1])]
+        return where, params
+
+    def years(self, sector):
+        where, params = self._where(sector)
+        return [year for year, in self.warehouse.query(f"SELECT DISTINCT d.year FROM demand d{where} ORDER BY d.year", params)]
+
+    def totals(self, sector, years=None):
+        where, params = self._where(sector, years)
+        rows = self.warehouse.query(f"SELECT l.label, TOTAL(d.value) FROM demand d JOIN labels l "
+                                    f"ON l.level = 'Country' AND l.code = d.country{where} "
+                                    f"GROUP BY l.label ORDER BY l.label", params)
+        return pd.Series([total for _, total in rows], index=pd.Index([label for label, _ in rows], name="Country"),
+                         name="Value", dtype=float)
+
+    def ranking(self, sector, years=None):
+        # Countries by descending demand; ties keep alphabetical order, like RankingIndex
+        key = (sector, None if years is None else tuple(years))
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            where, params = self._where(sector, years)
+            rows = self.warehouse.query(f"SELECT l.label FROM demand d JOIN labels l "
+                                        f"ON l.level = 'Country' AND l.code = d.country{where} "
+                                        f"GROUP BY l.label ORDER BY TOTAL(d.value) DESC, l.label", params)
+            order = [label for label, in rows]
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def top(self, sector, n=5, years=None):
+        return self.ranking(sector, years)[:n]
+
+    def top_series(self, sector, n=5, years=None):
+        # Same outputs as RankingIndex.top_series: yearly values of the top countries, and the countries
+        top = self.top(sector, n, years)
+        series = self.warehouse.cube.rollup(sector, ["Country", "Year"], country=top)
+        series = series.sort_values(["Country", "Year"], kind="stable").reset_index(drop=True)
+        return series[["Country", "Year", "Value"]], top
+
+
+def main(argv=None):
+    from scenarios import discover_scenarios, ScenarioData
+    from schema import COMPACT_SCHEMA
+
+    parser = argparse.ArgumentParser(description="Compile scenarios into SQLite warehouse files.")
+    parser.add_argument("scenarios", nargs="*", help="Scenario names (default: every discovered scenario)")
+    parser.add_argument("--out", default=WAREHOUSE_DIR or "warehouse", help="Output directory (PTX_WAREHOUSE_DIR)")
+    args = parser.parse_args(argv)
+
+    scenarios = discover_scenarios()
+    os.makedirs(args.out, exist_ok=True)
+    for name in args.scenarios or list(scenarios):
+        start = time.perf_counter()
+        frames = ScenarioData(scenarios[name], COMPACT_SCHEMA).refresh()
+        path = compile_warehouse(frames.cube, frames.dataset.countries, os.path.join(args.out, f"{name}.sqlite"),
+                                 frames.version)
+        print(f"{name}: {path} ({os.path.getsize(path) / 1e6:.2f} MB, {time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()